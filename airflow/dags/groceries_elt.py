@@ -93,6 +93,14 @@ def delete_outdated_amenities(cur):
         )
     """)
 
+def bump_dataset_version(cur, name="groceries"):
+    # Invalidate the grocery caches of the properties (see DatasetVersion in apt_app/models.py)
+    cur.execute("""
+        INSERT INTO apt_app_datasetversion (name, version, updated_at) VALUES (%s, 1, NOW())
+        ON CONFLICT (name) DO UPDATE
+        SET version = apt_app_datasetversion.version + 1, updated_at = NOW()
+    """, (name,))
+
 
 # === DAG ===
 @dag(
@@ -136,6 +144,7 @@ def grocery_elt_pipeline():
         cur = conn.cursor()
         upsert_amenities(cur)
         delete_outdated_amenities(cur)
+        bump_dataset_version(cur)
         conn.commit()
         cur.close()
         conn.close()
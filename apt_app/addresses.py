@@ -0,0 +1,162 @@
+"""
+Canonical form of Chicago street addresses, shared by every address lookup.
+
+`canonicalize_address()` reduces an address to its street line in the USPS style
+used by the City of Chicago datasets, e.g.
+
+    "5128-30 South Harper Avenue, Apt 2, Chicago, IL 60615" -> "5128 S HARPER AVE"
+
+Models with an address keep it in a `canonical_address` column (see
+`CanonicalAddressMixin`), so lookups are exact, indexed equality matches.
+
+ref:
+- https://pe.usps.com/text/pub28/28apc_002.htm (street suffixes)
+- https://pe.usps.com/text/pub28/28apc_003.htm (secondary unit designators)
+"""
+
+import re
+
+DIRECTIONALS = {
+    "NORTH": "N",
+    "SOUTH": "S",
+    "EAST": "E",
+    "WEST": "W",
+    "NORTHEAST": "NE",
+    "NORTHWEST": "NW",
+    "SOUTHEAST": "SE",
+    "SOUTHWEST": "SW",
+}
+
+STREET_TYPES = {
+    "AVENUE": "AVE",
+    "AV": "AVE",
+    "AVN": "AVE",
+    "STREET": "ST",
+    "STR": "ST",
+    "BOULEVARD": "BLVD",
+    "BLV": "BLVD",
+    "BL": "BLVD",
+    "DRIVE": "DR",
+    "DRV": "DR",
+    "PLACE": "PL",
+    "COURT": "CT",
+    "ROAD": "RD",
+    "PARKWAY": "PKWY",
+    "PKY": "PKWY",
+    "TERRACE": "TER",
+    "LANE": "LN",
+    "HIGHWAY": "HWY",
+    "SQUARE": "SQ",
+    "CIRCLE": "CIR",
+    "PLAZA": "PLZ",
+    "EXPRESSWAY": "EXPY",
+}
+
+# Secondary unit designators: everything from one of them onwards is dropped
+UNIT_DESIGNATORS = {
+    "#",
+    "APT",
+    "APARTMENT",
+    "UNIT",
+    "STE",
+    "SUITE",
+    "FL",
+    "FLOOR",
+    "RM",
+    "ROOM",
+    "BSMT",
+    "BASEMENT",
+    "REAR",
+}
+
+STATES = {"IL", "ILLINOIS"}
+CITY = "CHICAGO"
+
+_HOUSE_NUMBER_RANGE = re.compile(r"^(\d+)\s*-\s*\d+\b")
+_ZIP_CODE = re.compile(r"^\d{5}(-\d{4})?$")
+_PUNCTUATION = re.compile(r"[.,;]")
+
+
+def canonicalize_address(address) -> str:
+    """
+    Reduce an address to its canonical street line.
+
+    - uppercased, punctuation dropped and whitespace collapsed
+    - city, state and ZIP code stripped
+    - house number ranges reduced to the first number ("5128-30" -> "5128")
+    - unit suffixes ("APT 2", "UNIT 3B", "#2", ...) stripped
+    - directionals and street types abbreviated ("SOUTH" -> "S", "AVENUE" -> "AVE")
+
+    Inputs:
+        address (str): raw address, e.g. user input or a censusgeocode matched address.
+
+    Returns (str): canonical street line, "" if the address is empty.
+    """
+    if not address:
+        return ""
+    address = str(address).upper()
+
+    # Anything after the first comma is the unit, city, state or ZIP code
+    street_line = address.split(",")[0]
+    street_line = _HOUSE_NUMBER_RANGE.sub(r"\1", street_line.strip())
+    street_line = street_line.replace("#", " # ")
+    words = _PUNCTUATION.sub(" ", street_line).split()
+
+    # Without commas, strip a trailing "CHICAGO IL 60615" word by word
+    if words and _ZIP_CODE.match(words[-1]) and len(words) > 1:
+        words.pop()
+    if words and words[-1] in STATES and len(words) > 2:
+        words.pop()
+        if words[-1] == CITY and len(words) > 2:
+            words.pop()
+
+    # Drop the unit suffix, keeping at least the house number and street name
+    for idx, word in enumerate(words[2:], start=2):
+        if word in UNIT_DESIGNATORS:
+            words = words[:idx]
+            break
+
+    if len(words) > 2 and words[1] in DIRECTIONALS:
+        words[1] = DIRECTIONALS[words[1]]
+    if len(words) > 2:
+        if words[-1] in DIRECTIONALS:
+            words[-1] = DIRECTIONALS[words[-1]]
+            type_idx = -2
+        else:
+            type_idx = -1
+        words[type_idx] = STREET_TYPES.get(words[type_idx], words[type_idx])
+
+    return " ".join(words)
+
+
+def street_line_parts(street_line: str) -> tuple:
+    """
+    Split a canonical street line into its house number, directional, street name and
+    street type, e.g. "5128 S HARPER AVE" -> ("5128", "S", "HARPER", "AVE").
+    Missing parts are "", a trailing directional is appended to the leading one.
+    """
+    words = street_line.split()
+    number = words.pop(0) if words and words[0].isdigit() else ""
+    directionals = []
+    if len(words) > 1 and words[0] in DIRECTIONALS.values():
+        directionals.append(words.pop(0))
+    if len(words) > 1 and words[-1] in DIRECTIONALS.values():
+        directionals.append(words.pop())
+    street_type = words.pop() if len(words) > 1 and words[-1] in STREET_TYPES.values() else ""
+    return number, " ".join(directionals), " ".join(words), street_type
+
+
+def is_street_name_variant(street_line: str, other: str) -> bool:
+    """
+    Whether two canonical street lines can only differ in the spelling of the street name,
+    e.g. "5514 S BLACKSTON AVE" and "5514 S BLACKSTONE AVE": same house number,
+    directional and street type. Numbered streets must be the same ("60TH" and "61ST"
+    are different streets, not misspellings).
+    """
+    number, directional, name, street_type = street_line_parts(street_line)
+    other_number, other_directional, other_name, other_type = street_line_parts(other)
+    if (number, directional, street_type) != (other_number, other_directional, other_type):
+        return False
+    if any(char.isdigit() for char in name + other_name):
+        return name == other_name
+    return True
@@ -0,0 +1,165 @@
+"""
+Response cache for the read-only fetch_* endpoints.
+
+`cached_endpoint` stores the JSON body of successful responses in the default
+Django cache (see CACHES in config/settings.py), keyed by:
+    - the endpoint name,
+    - the query parameters the endpoint reads, normalized so that equivalent
+      requests ("41.79, -87.59" and "41.790000,-87.590000") share an entry,
+    - the current version of the datasets the response is computed from, so a
+      reload of the transit or grocery data invalidates the entries at once.
+
+Entries expire after the per-endpoint TTL in `ENDPOINT_CACHE_TTL_SECONDS`
+(config/constants.json). Responses carry an `X-Cache: HIT|MISS` header and
+hit/miss counters are kept in the cache itself, so all workers share them.
+
+ref: https://docs.djangoproject.com/en/5.2/topics/cache/#the-low-level-cache-api
+"""
+
+import hashlib
+from functools import wraps
+from django.core.cache import cache
+from django.http import HttpResponse
+from apt_app.addresses import canonicalize_address
+from apt_app.models import DatasetVersion
+from config import load_constants
+
+CONSTANTS = load_constants()
+
+KEY_PREFIX = "endpoint"
+STATS_KEY_PREFIX = "endpoint_stats"
+
+# Names of the endpoints wrapped by `cached_endpoint`, for `cache_stats()`
+CACHED_ENDPOINTS = []
+
+
+def normalize_geocode(value: str) -> str:
+    """'41.79, -87.59' -> '41.790000,-87.590000' (~0.1 m precision)"""
+    try:
+        return ",".join(f"{float(part):.6f}" for part in value.split(","))
+    except ValueError:
+        return value.strip()
+
+
+def normalize_int(value: str) -> str:
+    """' 015' -> '15'"""
+    try:
+        return str(int(value))
+    except ValueError:
+        return value.strip()
+
+
+def normalize_list(value: str) -> str:
+    """'4, 6 ,X4' -> '4,6,X4', keeping the order"""
+    return ",".join(part.strip() for part in value.split(",") if part.strip())
+
+
+def normalize_set(value: str) -> str:
+    """'pharmacy, grocery,Grocery' -> 'grocery,pharmacy', when the order is irrelevant"""
+    return ",".join(sorted({part.strip().lower() for part in value.split(",") if part.strip()}))
+
+
+# How each query parameter is normalized, parameters not listed are only stripped
+PARAM_NORMALIZERS = {
+    "geocode": normalize_geocode,
+    "walking_time": normalize_int,
+    "property_id": normalize_int,
+    "limit": normalize_int,
+    "zoom": normalize_int,
+    "address": canonicalize_address,
+    "bus_route": normalize_list,
+    "types": normalize_set,
+}
+
+
+def endpoint_cache_key(name: str, query, params, datasets=()) -> str:
+    """
+    Cache key of a request to an endpoint.
+
+    Inputs:
+        name (str): endpoint name.
+        query (QueryDict | dict): query parameters of the request.
+        params (iterable of str): parameters the endpoint reads, others are ignored
+            so that e.g. cache-busting parameters do not split the entries.
+        datasets (iterable of DatasetName): datasets the response is computed from.
+
+    Returns (str): "endpoint:<name>:<md5 of the normalized parameters and versions>"
+    """
+    parts = []
+    for param in sorted(params):
+        value = query.get(param)
+        if value is not None:
+            normalize = PARAM_NORMALIZERS.get(param, str.strip)
+            parts.append(f"{param}={normalize(value)}")
+    for dataset in sorted(datasets):
+        parts.append(f"{dataset}@{DatasetVersion.current(dataset)}")
+    digest = hashlib.md5("&".join(parts).encode()).hexdigest()
+    return f"{KEY_PREFIX}:{name}:{digest}"
+
+
+def _count(name: str, outcome: str) -> None:
+    """Increment the hit or miss counter of an endpoint"""
+    key = f"{STATS_KEY_PREFIX}:{name}:{outcome}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        # incr() raises ValueError when the key does not exist yet
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def cached_endpoint(name: str, params, datasets=()):
+    """
+    Cache the successful (status 200) responses of a GET endpoint.
+
+    Inputs:
+        name (str): endpoint name, also the key of its TTL in `ENDPOINT_CACHE_TTL_SECONDS`.
+        params (iterable of str): query parameters the endpoint reads.
+        datasets (iterable of DatasetName): datasets the response is computed from.
+    """
+    ttl = CONSTANTS["ENDPOINT_CACHE_TTL_SECONDS"][name]
+    CACHED_ENDPOINTS.append(name)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = endpoint_cache_key(name, request.GET, params, datasets)
+            cached = cache.get(key)
+            if cached is not None:
+                _count(name, "hits")
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response["X-Cache"] = "HIT"
+                return response
+
+            _count(name, "misses")
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, (response.content, response["Content-Type"]), ttl)
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of each cached endpoint, e.g. {"fetch_groceries": {"hits": 3, ...}}"""
+    keys = {
+        (name, outcome): f"{STATS_KEY_PREFIX}:{name}:{outcome}"
+        for name in CACHED_ENDPOINTS
+        for outcome in ("hits", "misses")
+    }
+    values = cache.get_many(keys.values())
+    stats = {}
+    for name in CACHED_ENDPOINTS:
+        hits = values.get(keys[(name, "hits")], 0)
+        misses = values.get(keys[(name, "misses")], 0)
+        total = hits + misses
+        stats[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else None,
+        }
+    return stats
@@ -0,0 +1,270 @@
+"""
+Client for the Census geocoder used by `fetch_all_data` and the batch geocoding command.
+
+Compared to calling `censusgeocode` directly, the client:
+    - reuses pooled keep-alive connections across calls (sync and async),
+    - bounds every call with a deadline,
+    - stops calling the Census service for a while after repeated failures
+      (circuit breaker), so callers can fail fast and serve cached or local results.
+
+ref:
+- https://geocoding.geo.census.gov/geocoder/Geocoding_Services_API.html
+- https://www.python-httpx.org/advanced/resource-limits/
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+import weakref
+import httpx
+from config import load_constants
+
+CONSTANTS = load_constants()
+
+CENSUS_GEOCODER_URL = "https://geocoding.geo.census.gov/geocoder"
+CENSUS_BENCHMARK = "Public_AR_Current"
+CENSUS_VINTAGE = "Current_Current"
+
+
+class GeocoderUnavailable(Exception):
+    """
+    Raised when the Census geocoder fails, rejects the request, times out or the circuit
+    is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Minimal thread-safe circuit breaker.
+
+    - closed: calls go through, consecutive failures are counted.
+    - open: after `failure_threshold` consecutive failures, calls are rejected
+      for `reset_timeout` seconds.
+    - half-open: after `reset_timeout`, one trial call is let through; its
+      success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+
+
+class CensusGeocoder:
+    """
+    Census geocoder client with pooled connections, a per-call deadline and a circuit
+    breaker. `address()` and `batch()` are synchronous (for WSGI views and management
+    commands), `aaddress()` is the asyncio equivalent for async views and batch jobs.
+    """
+
+    def __init__(
+        self,
+        base_url=CENSUS_GEOCODER_URL,
+        timeout=CONSTANTS["GEOCODER_TIMEOUT_SECONDS"],
+        breaker=None,
+        max_connections=20,
+        transport=None,
+        async_transport=None,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=CONSTANTS["GEOCODER_BREAKER_FAILURES"],
+            reset_timeout=CONSTANTS["GEOCODER_BREAKER_RESET_SECONDS"],
+        )
+        self._limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self._transport = transport
+        self._async_transport = async_transport
+        self._client = None
+        self._client_lock = threading.Lock()
+        # Sync calls run in these threads so that the caller stops waiting at the deadline
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_connections, thread_name_prefix="census-geocoder"
+        )
+        # httpx.AsyncClient is bound to the event loop it was created in
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    @property
+    def client(self) -> httpx.Client:
+        with self._client_lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    base_url=self.base_url, limits=self._limits, transport=self._transport
+                )
+            return self._client
+
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_clients:
+            self._async_clients[loop] = httpx.AsyncClient(
+                base_url=self.base_url, limits=self._limits, transport=self._async_transport
+            )
+        return self._async_clients[loop]
+
+    @staticmethod
+    def _address_params(street, city, state) -> dict:
+        return {
+            "street": street,
+            "city": city,
+            "state": state,
+            "benchmark": CENSUS_BENCHMARK,
+            "vintage": CENSUS_VINTAGE,
+            "format": "json",
+        }
+
+    def _check_circuit(self):
+        if not self.breaker.allow_request():
+            raise GeocoderUnavailable("Census geocoder circuit is open")
+
+    def _record_error(self, error: Exception):
+        """
+        Count an error against the circuit breaker, unless the Census service answered
+        and only rejected the request (4xx, e.g. a malformed address): it is up, so a few
+        bad addresses must not open the circuit for everyone.
+        """
+        if isinstance(error, httpx.HTTPStatusError) and error.response.is_client_error:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def _parse_matches(self, response: httpx.Response) -> list:
+        """Return the address matches (same shape as `censusgeocode.address()`)."""
+        try:
+            response.raise_for_status()
+            matches = response.json()["result"]["addressMatches"]
+        except (httpx.HTTPStatusError, ValueError, KeyError) as e:
+            self._record_error(e)
+            raise GeocoderUnavailable(f"Invalid response from Census geocoder: {e}") from e
+        self.breaker.record_success()
+        return matches
+
+    def _get_within_deadline(self, url, params, deadline) -> httpx.Response:
+        """
+        GET `url` within `deadline` seconds in total. httpx timeouts apply to each phase
+        (connect, every read, ...), so a response trickling in could last much longer:
+        the body is read chunk by chunk in a pool thread, which gives up once the deadline
+        has passed, and the caller stops waiting for it at the deadline.
+        """
+        deadline_at = time.monotonic() + deadline
+
+        def get():
+            with self.client.stream("GET", url, params=params, timeout=deadline) as response:
+                body = bytearray()
+                for chunk in response.iter_bytes():
+                    if time.monotonic() > deadline_at:
+                        raise httpx.ReadTimeout("deadline exceeded", request=response.request)
+                    body += chunk
+            # Decoded body, for raise_for_status() and json()
+            return httpx.Response(
+                response.status_code, content=bytes(body), request=response.request
+            )
+
+        future = self._executor.submit(get)
+        try:
+            return future.result(timeout=deadline)
+        except concurrent.futures.TimeoutError as e:
+            raise httpx.TimeoutException(f"no response within {deadline}s") from e
+
+    def address(self, street, city="Chicago", state="IL", timeout=None) -> list:
+        """
+        Geocode one address, within a deadline for the whole call (connection, request
+        and response). Returns the list of address matches (empty when the address is
+        not matched), raises GeocoderUnavailable otherwise.
+        """
+        self._check_circuit()
+        try:
+            response = self._get_within_deadline(
+                "/geographies/address",
+                params=self._address_params(street, city, state),
+                deadline=timeout or self.timeout,
+            )
+        except httpx.HTTPError as e:
+            self.breaker.record_failure()
+            raise GeocoderUnavailable(f"Census geocoder error: {e}") from e
+        return self._parse_matches(response)
+
+    async def aaddress(self, street, city="Chicago", state="IL", timeout=None) -> list:
+        """Async version of address(), bounded by the same deadline."""
+        self._check_circuit()
+        deadline = timeout or self.timeout
+        try:
+            response = await asyncio.wait_for(
+                self._async_client().get(
+                    "/geographies/address",
+                    params=self._address_params(street, city, state),
+                    timeout=deadline,
+                ),
+                timeout=deadline,
+            )
+        except (httpx.HTTPError, asyncio.TimeoutError) as e:
+            self.breaker.record_failure()
+            raise GeocoderUnavailable(f"Census geocoder error: {e!r}") from e
+        return self._parse_matches(response)
+
+    def batch(self, csv_text, benchmark=CENSUS_BENCHMARK, url=None, timeout=None) -> str:
+        """
+        Upload a Census batch file ("id,street,city,state,zip" rows) and return the
+        CSV response text. `url` overrides the batch endpoint (e.g. a local stand-in).
+        Management commands only: `timeout` applies to each phase of the upload, not to
+        the whole call as in `address()`.
+        """
+        self._check_circuit()
+        try:
+            response = self.client.post(
+                url or "/locations/addressbatch",
+                files={"addressFile": ("addresses.csv", csv_text, "text/csv")},
+                data={"benchmark": benchmark},
+                timeout=timeout or self.timeout,
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            self._record_error(e)
+            raise GeocoderUnavailable(f"Census batch geocoder error: {e}") from e
+        self.breaker.record_success()
+        return response.text
+
+
+# Shared client, so that connections and circuit state are reused across requests
+CENSUS_GEOCODER = CensusGeocoder()
@@ -0,0 +1,115 @@
+"""
+GeoJSON layers built inside PostgreSQL.
+
+`fetch_feature_collection()` wraps a layer query (one row per feature) so that PostGIS
+returns the whole FeatureCollection as a single JSON text value, built with
+`ST_AsGeoJSON` and `json_build_object` / `json_agg`. Endpoints can send that text as is
+with `geojson_response()`, or wrapped in their response with `json_text()`, without
+creating model instances or encoding JSON twice.
+
+ref:
+- https://postgis.net/docs/ST_AsGeoJSON.html
+- https://www.postgresql.org/docs/current/functions-json.html
+"""
+
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+from config import load_constants
+
+CONSTANTS = load_constants()
+
+# Decimal digits of the coordinates, 6 digits is ~0.1 m
+GEOJSON_PRECISION = CONSTANTS["GEOJSON_PRECISION"]
+
+
+def feature_collection_sql(
+    layer_sql: str, properties, geometry="geometry", order_by=None, group_by=None
+):
+    """
+    SQL returning (FeatureCollection as JSON text, number of features) for a layer query,
+    or one (FeatureCollection, number of features, group) row per group.
+
+    Inputs:
+        layer_sql (str): query with one row per feature, using named (%(name)s) parameters.
+        properties (iterable of str): columns of the layer query that make up the feature
+            properties, under the same names.
+        geometry (str): geometry column of the layer query, in SRID 4326.
+        order_by (str): order of the features, over the columns of the layer query.
+        group_by (str): column of the layer query, one FeatureCollection per value.
+
+    Returns (str): SQL with the parameters of `layer_sql` and %(precision)s.
+    """
+    props = ", ".join(f"'{name}', layer.{name}" for name in properties)
+    order = f" ORDER BY {order_by}" if order_by else ""
+    group = f", layer.{group_by}" if group_by else ""
+    group_clause = f"GROUP BY layer.{group_by}" if group_by else ""
+    return f"""
+        SELECT
+            json_build_object(
+                'type', 'FeatureCollection',
+                'features', COALESCE(
+                    json_agg(
+                        json_build_object(
+                            'type', 'Feature',
+                            'geometry', ST_AsGeoJSON(layer.{geometry}, %(precision)s)::json,
+                            'properties', json_build_object({props})
+                        ){order}
+                    ),
+                    '[]'::json
+                )
+            )::text,
+            COUNT(*){group}
+        FROM ({layer_sql}) AS layer
+        {group_clause}
+    """
+
+
+def fetch_feature_collection(layer_sql: str, params: dict, properties, **kwargs):
+    """
+    Run a layer query and build its FeatureCollection in the database
+    (see `feature_collection_sql` for the arguments).
+
+    Returns (tuple[str, int]): FeatureCollection as JSON text and its number of features.
+    """
+    sql = feature_collection_sql(layer_sql, properties, **kwargs)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params | {"precision": GEOJSON_PRECISION})
+        return cursor.fetchone()
+
+
+def fetch_feature_collections(layer_sql: str, params: dict, properties, group_by, **kwargs):
+    """
+    `fetch_feature_collection` with one FeatureCollection per value of the `group_by`
+    column, in a single query.
+
+    Returns (dict): {group: (FeatureCollection as JSON text, number of features)}, groups
+        without features are missing.
+    """
+    sql = feature_collection_sql(layer_sql, properties, group_by=group_by, **kwargs)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params | {"precision": GEOJSON_PRECISION})
+        return {group: (text, count) for text, count, group in cursor.fetchall()}
+
+
+def json_text(content: dict, **json_texts) -> str:
+    """
+    JSON text of `content` followed by the members in `json_texts`, whose values are JSON
+    texts (e.g. FeatureCollections built by the database) spliced in without decoding.
+    """
+    members = [json.dumps(content, cls=DjangoJSONEncoder)[1:-1]] if content else []
+    members += [f"{json.dumps(name)}: {text}" for name, text in json_texts.items()]
+    return "{" + ", ".join(members) + "}"
+
+
+def geojson_response(text: str, status: int = 200) -> HttpResponse:
+    """Send JSON text built by the database as is"""
+    return HttpResponse(text, content_type="application/json", status=status)
+
+
+def layer_response(content: dict, status: int, text: str = None) -> HttpResponse:
+    """Send the JSON text of a response if it was built, otherwise encode its content"""
+    if text is not None:
+        return geojson_response(text, status)
+    return JsonResponse(content, status=status)
@@ -0,0 +1,144 @@
+import csv
+import io
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apt_app.geocoder import CENSUS_BENCHMARK, CENSUS_GEOCODER, GeocoderUnavailable
+from apt_app.models import Address, GeocodeCache, Property, Violation
+from apt_app.views.fetch_all_data import normalize_geocode_query
+
+# ref: https://geocoding.geo.census.gov/geocoder/Geocoding_Services_API.html#_Toc4 (batch)
+CENSUS_BATCH_MAX_ROWS = 10000
+
+
+def build_batch_csv(addresses) -> str:
+    """
+    Build the Census batch input file: "Unique ID, Street address, City, State, ZIP".
+    The unique id is the position of the address in the list.
+    """
+    out = io.StringIO()
+    writer = csv.writer(out)
+    for idx, address in enumerate(addresses):
+        writer.writerow([idx, address, "Chicago", "IL", ""])
+    return out.getvalue()
+
+
+def parse_batch_response(text: str) -> dict:
+    """
+    Parse the Census batch response into {unique id: (matched address, lon, lat)}.
+    Only rows with a "Match" inside Chicago are kept.
+    """
+    results = {}
+    for row in csv.reader(io.StringIO(text)):
+        if len(row) < 6 or row[2] != "Match":
+            continue
+        matched_address = row[4].strip()
+        if ", CHICAGO, IL" not in matched_address.upper():
+            continue
+        try:
+            longitude, latitude = (float(c) for c in row[5].split(","))
+        except ValueError:
+            continue
+        results[int(row[0])] = (matched_address, longitude, latitude)
+    return results
+
+
+class Command(BaseCommand):
+    # ref: https://docs.djangoproject.com/en/5.2/howto/custom-management-commands/
+
+    help = (
+        "Geocode addresses in bulk with the Census batch geocoder and create or "
+        "update the matching Property rows (defaults to the distinct Violation addresses)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            type=str,
+            help="Optional text file with one address per line, instead of Violation addresses",
+        )
+        parser.add_argument(
+            "--url", type=str, default=None, help="Override the Census batch geocoder endpoint"
+        )
+        parser.add_argument("--benchmark", type=str, default=CENSUS_BENCHMARK)
+        parser.add_argument("--batch-size", type=int, default=CENSUS_BATCH_MAX_ROWS)
+        parser.add_argument("--timeout", type=int, default=600, help="Timeout per batch (s)")
+
+    def handle(self, *args, **kwargs):
+        if kwargs["file"]:
+            with open(kwargs["file"]) as f:
+                addresses = sorted({line.strip() for line in f if line.strip()})
+        else:
+            addresses = list(
+                Violation.objects.order_by("address").values_list("address", flat=True).distinct()
+            )
+        if not 0 < kwargs["batch_size"] <= CENSUS_BATCH_MAX_ROWS:
+            raise CommandError(f"--batch-size must be between 1 and {CENSUS_BATCH_MAX_ROWS}")
+
+        self.stdout.write(f"Geocoding {len(addresses)} addresses...")
+        matched = 0
+        for start in range(0, len(addresses), kwargs["batch_size"]):
+            chunk = addresses[start : start + kwargs["batch_size"]]
+            try:
+                results = self.geocode_batch(chunk, kwargs)
+            except GeocoderUnavailable as e:
+                self.stdout.write(self.style.ERROR(f"Error geocoding batch at {start}: {e}"))
+                continue
+            self.upsert_results(chunk, results)
+            matched += len(results)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully geocoded {matched} of {len(addresses)} addresses")
+        )
+
+    def geocode_batch(self, addresses, kwargs) -> dict:
+        response_text = CENSUS_GEOCODER.batch(
+            build_batch_csv(addresses),
+            benchmark=kwargs["benchmark"],
+            url=kwargs["url"],
+            timeout=kwargs["timeout"],
+        )
+        return parse_batch_response(response_text)
+
+    def upsert_results(self, addresses, results):
+        """
+        Create the missing Property rows (same address format as save_property_in_django),
+        re-validate the location of the existing ones, and warm the geocode cache.
+        Properties are upserted on the unique canonical address in one statement.
+        """
+        # Keyed by canonical address, as several matched addresses can share one
+        properties = {}
+        for matched_address, longitude, latitude in results.values():
+            prop = Property(address=matched_address)
+            # bulk_create() does not call save(), so the canonical address is set here
+            prop.set_canonical_address()
+            prop.setup_location(latitude, longitude)
+            properties[prop.canonical_address] = prop
+
+        address_ids = Address.objects.ids_for(properties)
+        for canonical_address, prop in properties.items():
+            prop.address_obj_id = address_ids[canonical_address]
+        Property.objects.bulk_create(
+            list(properties.values()),
+            update_conflicts=True,
+            unique_fields=["canonical_address"],
+            update_fields=["location", "address_obj"],
+        )
+
+        # Keyed by query, as several raw addresses can normalize to the same one
+        cache_entries = {
+            normalize_geocode_query(addresses[idx]): GeocodeCache(
+                query=normalize_geocode_query(addresses[idx]),
+                matched_address=matched_address,
+                longitude=longitude,
+                latitude=latitude,
+                in_chicago=True,
+                cached_at=timezone.now(),
+            )
+            for idx, (matched_address, longitude, latitude) in results.items()
+        }
+        GeocodeCache.objects.bulk_create(
+            list(cache_entries.values()),
+            update_conflicts=True,
+            unique_fields=["query"],
+            update_fields=["matched_address", "longitude", "latitude", "in_chicago", "cached_at"],
+        )
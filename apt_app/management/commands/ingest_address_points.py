@@ -0,0 +1,89 @@
+import csv
+import json
+from django.core.management.base import BaseCommand, CommandError
+from apt_app.addresses import canonicalize_address
+from apt_app.models import AddressPoint
+
+
+class Command(BaseCommand):
+    # ref: https://docs.djangoproject.com/en/5.2/howto/custom-management-commands/
+
+    help = "Ingest City of Chicago address points from a .csv or .geojson file"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            type=str,
+            help="Path to the .csv or .geojson file",
+            default="data/address_points.csv",
+        )
+        parser.add_argument(
+            "--address-field", type=str, default="ADDRESS", help="Column with the street line"
+        )
+        parser.add_argument("--zip-field", type=str, default="ZIP", help="Column with the ZIP")
+        parser.add_argument(
+            "--latitude-field", type=str, default="LATITUDE", help="Column with the latitude"
+        )
+        parser.add_argument(
+            "--longitude-field", type=str, default="LONGITUDE", help="Column with the longitude"
+        )
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="Delete the existing address points before ingesting",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **kwargs):
+        if kwargs["file"].endswith((".geojson", ".json")):
+            rows = self.read_geojson(kwargs)
+        elif kwargs["file"].endswith(".csv"):
+            rows = self.read_csv(kwargs)
+        else:
+            raise CommandError("File must be a .csv or .geojson file")
+
+        if kwargs["replace"]:
+            AddressPoint.objects.all().delete()
+
+        batch, total = [], 0
+        for idx, (address, zip_code, latitude, longitude) in enumerate(rows):
+            # Stored in canonical form, so that local geocoding is an exact match
+            address = canonicalize_address(address)
+            if not address:
+                continue
+            address_point = AddressPoint(address=address, zip_code=str(zip_code or "")[:5])
+            try:
+                address_point.setup_location(latitude, longitude)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"Error processing row {idx}: {e}"))
+                continue
+            batch.append(address_point)
+            if len(batch) >= kwargs["batch_size"]:
+                total += len(AddressPoint.objects.bulk_create(batch))
+                batch = []
+        total += len(AddressPoint.objects.bulk_create(batch))
+
+        self.stdout.write(self.style.SUCCESS(f"Successfully imported {total} address points"))
+
+    def read_csv(self, kwargs):
+        with open(kwargs["file"]) as f:
+            for row in csv.DictReader(f):
+                yield (
+                    row.get(kwargs["address_field"]),
+                    row.get(kwargs["zip_field"]),
+                    row.get(kwargs["latitude_field"]),
+                    row.get(kwargs["longitude_field"]),
+                )
+
+    def read_geojson(self, kwargs):
+        with open(kwargs["file"]) as f:
+            data = json.load(f)
+        for feature in data.get("features", []):
+            props = feature.get("properties") or {}
+            coordinates = (feature.get("geometry") or {}).get("coordinates") or [None, None]
+            yield (
+                props.get(kwargs["address_field"]),
+                props.get(kwargs["zip_field"]),
+                coordinates[1],
+                coordinates[0],
+            )
@@ -1,7 +1,7 @@
 import os
 import json
 from django.core.management.base import BaseCommand, CommandError
-from apt_app.models import InspectionSummary
+from apt_app.models import DatasetName, DatasetVersion, InspectionSummary
 
 
 class Command(BaseCommand):
@@ -26,4 +26,6 @@ class Command(BaseCommand):
                     address=address,
                     summary=json_object,
                 )
+        # Invalidate the cached /fetch_inspections/ responses
+        DatasetVersion.bump(DatasetName.INSPECTIONS)
         self.stdout.write(self.style.SUCCESS("Successfully imported inspection summaries"))
@@ -3,9 +3,10 @@ import csv
 import pandas as pd
 from django.core.management.base import BaseCommand, CommandError
 from django.db import IntegrityError
-from apt_app.models import Violation
+from apt_app.models import Address, DatasetName, DatasetVersion, Violation
 from django.contrib.gis.geos import Point
 from datetime import datetime
+from apt_app.views.fetch_inspections import refresh_violation_stats
 from scripts import inspections_utils as iu
 
 
@@ -31,11 +32,19 @@ class Command(BaseCommand):
             self.stream_ingest(*args, **kwargs)
         else:
             self.batch_ingest(*args, **kwargs)
+        # Precompute the counts of /fetch_inspections/, then invalidate its cached responses
+        rows = refresh_violation_stats()
+        self.stdout.write(f"Refreshed violation stats of {rows} addresses and start dates")
+        DatasetVersion.bump(DatasetName.INSPECTIONS)
 
     def batch_ingest(self, *args, **kwargs):
         try:
             df_in = pd.read_csv(kwargs["file"])
             objs: list = [iu.create_one_violation_object(row) for _, row in df_in.iterrows()]
+            # bulk_create() does not call save(), so the addresses are linked here
+            address_ids = Address.objects.ids_for(obj.canonical_address for obj in objs)
+            for obj in objs:
+                obj.address_obj_id = address_ids.get(obj.canonical_address)
             Violation.objects.bulk_create(objs, ignore_conflicts=True)
             self.stdout.write(self.style.SUCCESS("Successfully imported raw violations"))
         except Exception as e:
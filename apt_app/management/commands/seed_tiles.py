@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from apt_app.tiles import (
+    TILE_LAYERS,
+    TILE_STORE_BOUNDS,
+    TILE_STORE_MAX_ZOOM,
+    get_tile,
+    invalidate_tiles,
+    tiles_covering,
+)
+
+
+class Command(BaseCommand):
+    # ref: https://docs.djangoproject.com/en/5.2/howto/custom-management-commands/
+
+    help = (
+        "Pre-render the vector tiles of Hyde Park (HP_BOUNDS) into the tile store, "
+        "after deleting the tiles of previous dataset versions"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--layers",
+            type=str,
+            default=",".join(TILE_LAYERS),
+            help="Comma-separated layers to seed (default: all)",
+        )
+        parser.add_argument("--min-zoom", type=int, default=12)
+        parser.add_argument("--max-zoom", type=int, default=17)
+        parser.add_argument(
+            "--refresh", action="store_true", help="Render the tiles again even if stored"
+        )
+
+    def handle(self, *args, **kwargs):
+        layers = [layer.strip() for layer in kwargs["layers"].split(",") if layer.strip()]
+        unknown = set(layers) - set(TILE_LAYERS)
+        if unknown:
+            raise CommandError(f"Unknown layers: {', '.join(sorted(unknown))}")
+        # Tiles above TILE_STORE_MAX_ZOOM are never stored
+        if not 0 <= kwargs["min_zoom"] <= kwargs["max_zoom"] <= TILE_STORE_MAX_ZOOM:
+            raise CommandError(f"Expected 0 <= --min-zoom <= --max-zoom <= {TILE_STORE_MAX_ZOOM}")
+
+        deleted = invalidate_tiles()
+        self.stdout.write(f"Deleted {deleted} stale tile sets")
+
+        for layer in layers:
+            rendered = stored = 0
+            for z in range(kwargs["min_zoom"], kwargs["max_zoom"] + 1):
+                for x, y in tiles_covering(TILE_STORE_BOUNDS, z):
+                    _, hit = get_tile(layer, z, x, y, refresh=kwargs["refresh"])
+                    stored += hit
+                    rendered += not hit
+            self.stdout.write(
+                f"{layer}: {rendered} tiles rendered (empty ones are not stored), "
+                f"{stored} already stored"
+            )
+        self.stdout.write(self.style.SUCCESS("Done"))
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0018_alter_inspectionsummary_property'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=512, unique=True)),
+                ('matched_address', models.CharField(max_length=255)),
+                ('longitude', models.FloatField()),
+                ('latitude', models.FloatField()),
+                ('in_chicago', models.BooleanField()),
+                ('cached_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
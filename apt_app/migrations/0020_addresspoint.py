@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:41
+
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0019_geocodecache'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='AddressPoint',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('address', models.CharField(max_length=255)),
+                ('zip_code', models.CharField(blank=True, default='', max_length=10)),
+                ('location', django.contrib.gis.db.models.fields.PointField(srid=4326)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['address'], name='addresspoint_address_idx'), django.contrib.postgres.indexes.GinIndex(fields=['address'], name='addresspoint_address_trgm', opclasses=['gin_trgm_ops'])],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+from apt_app.addresses import canonicalize_address
+
+MODELS_WITH_ADDRESS = ['property', 'violation', 'inspectionsummary', 'savedproperty']
+
+
+def backfill_canonical_address(apps, schema_editor):
+    """Fill canonical_address for the rows created before the column existed"""
+    for model_name in MODELS_WITH_ADDRESS:
+        model = apps.get_model('apt_app', model_name)
+        batch = []
+        for obj in model.objects.only('pk', 'address').iterator(chunk_size=2000):
+            obj.canonical_address = canonicalize_address(obj.address)
+            batch.append(obj)
+            if len(batch) >= 2000:
+                model.objects.bulk_update(batch, ['canonical_address'])
+                batch = []
+        model.objects.bulk_update(batch, ['canonical_address'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0020_addresspoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='canonical_address',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='violation',
+            name='canonical_address',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='inspectionsummary',
+            name='canonical_address',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='savedproperty',
+            name='canonical_address',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_canonical_address, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+TABLES_WITH_ADDRESS = [
+    'apt_app_property',
+    'apt_app_violation',
+    'apt_app_inspectionsummary',
+    'apt_app_savedproperty',
+]
+
+CREATE_ADDRESSES = """
+    INSERT INTO apt_app_address (canonical)
+    SELECT DISTINCT canonical_address FROM {table} WHERE canonical_address <> ''
+    ON CONFLICT (canonical) DO NOTHING;
+"""
+
+LINK_ADDRESSES = """
+    UPDATE {table} AS t SET address_obj_id = a.id
+    FROM apt_app_address AS a
+    WHERE a.canonical = t.canonical_address;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0021_canonical_address'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Address',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('canonical', models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='address_obj',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='properties', to='apt_app.address'),
+        ),
+        migrations.AddField(
+            model_name='violation',
+            name='address_obj',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='violations', to='apt_app.address'),
+        ),
+        migrations.AddField(
+            model_name='inspectionsummary',
+            name='address_obj',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='inspection_summaries', to='apt_app.address'),
+        ),
+        migrations.AddField(
+            model_name='savedproperty',
+            name='address_obj',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='saved_properties', to='apt_app.address'),
+        ),
+        migrations.RunSQL(
+            [CREATE_ADDRESSES.format(table=table) for table in TABLES_WITH_ADDRESS]
+            + [LINK_ADDRESSES.format(table=table) for table in TABLES_WITH_ADDRESS],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:02
+
+from django.db import migrations, models
+
+# Keep the oldest Property of each canonical address. Blank addresses canonicalize to
+# '' without being the same address, so they are never merged (see check_blank_addresses)
+DUPLICATES = """
+    SELECT id, MIN(id) OVER (PARTITION BY canonical_address) AS keep_id
+    FROM apt_app_property
+    WHERE canonical_address <> ''
+"""
+
+# Tables (and columns) with a foreign key to Property
+REFERENCES = [
+    ('apt_app_savedproperty', 'property_obj_id'),
+    ('apt_app_inspection', 'property_id'),
+    ('apt_app_inspectionsummary', 'property_id'),
+]
+
+REPOINT_REFERENCES = """
+    UPDATE {table} AS t SET {column} = d.keep_id
+    FROM ({duplicates}) AS d
+    WHERE t.{column} = d.id AND d.id <> d.keep_id;
+"""
+
+DELETE_DUPLICATES = f"""
+    DELETE FROM apt_app_property AS p
+    USING ({DUPLICATES}) AS d
+    WHERE p.id = d.id AND d.id <> d.keep_id;
+"""
+
+
+def check_blank_addresses(apps, schema_editor):
+    """Stop, rather than merge them, when several properties have a blank address"""
+    Property = apps.get_model('apt_app', 'Property')
+    blank_ids = list(
+        Property.objects.filter(canonical_address='').order_by('id').values_list('id', flat=True)
+    )
+    if len(blank_ids) > 1:
+        raise RuntimeError(
+            f"Properties {blank_ids} have a blank address, which must be unique: "
+            "fix or delete them before adding unique_property_canonical_address"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0022_address'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_blank_addresses, reverse_code=migrations.RunPython.noop),
+        migrations.RunSQL(
+            [
+                REPOINT_REFERENCES.format(table=table, column=column, duplicates=DUPLICATES)
+                for table, column in REFERENCES
+            ]
+            + [DELETE_DUPLICATES],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='canonical_address',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name='property',
+            constraint=models.UniqueConstraint(fields=('canonical_address',), name='unique_property_canonical_address'),
+        ),
+    ]
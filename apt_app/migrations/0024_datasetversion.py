@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0023_property_unique_canonical_address'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetVersion',
+            fields=[
+                ('name', models.CharField(choices=[('transit', 'Transit stops and routes'), ('groceries', 'Grocery stores')], max_length=50, primary_key=True, serialize=False)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
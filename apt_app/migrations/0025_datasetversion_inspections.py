@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0024_datasetversion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='datasetversion',
+            name='name',
+            field=models.CharField(choices=[('transit', 'Transit stops and routes'), ('groceries', 'Grocery stores'), ('inspections', 'Building violations and inspection summaries')], max_length=50, primary_key=True, serialize=False),
+        ),
+    ]
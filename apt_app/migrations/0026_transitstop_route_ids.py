@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:05
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0025_datasetversion_inspections'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transitstop',
+            name='route_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=20), blank=True, default=list, size=None),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE apt_app_transitstop AS stop
+                SET route_ids = ARRAY(
+                    SELECT route_stop.transitroute_id
+                    FROM apt_app_transitroute_stops AS route_stop
+                    WHERE route_stop.transitstop_id = stop.id
+                    ORDER BY route_stop.transitroute_id
+                )
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='transitstop',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['route_ids'], name='transitstop_route_ids_gin'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:30
+
+import django.contrib.gis.db.models.fields
+import django.contrib.gis.db.models.functions
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0026_transitstop_route_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='amenity',
+            name='location_utm',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.gis.db.models.functions.Transform('location', 32616), output_field=django.contrib.gis.db.models.fields.PointField(srid=32616)),
+        ),
+        migrations.AddField(
+            model_name='crime',
+            name='location_utm',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.gis.db.models.functions.Transform('location', 32616), output_field=django.contrib.gis.db.models.fields.PointField(srid=32616)),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='location_utm',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.gis.db.models.functions.Transform('location', 32616), output_field=django.contrib.gis.db.models.fields.PointField(srid=32616)),
+        ),
+        migrations.AddField(
+            model_name='transitstop',
+            name='location_utm',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.gis.db.models.functions.Transform('location', 32616), output_field=django.contrib.gis.db.models.fields.PointField(srid=32616)),
+        ),
+        migrations.AddIndex(
+            model_name='amenity',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['location_utm'], name='amenity_location_utm_gist'),
+        ),
+        migrations.AddIndex(
+            model_name='crime',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['location_utm'], name='crime_location_utm_gist'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['location_utm'], name='property_location_utm_gist'),
+        ),
+        migrations.AddIndex(
+            model_name='transitstop',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['location_utm'], name='transitstop_location_utm_gist'),
+        ),
+        # Dropped by 0017 when Amenity stopped inheriting the Meta of LocationBasedFacilities
+        migrations.AddIndex(
+            model_name='amenity',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['location'], name='apt_app_ame_locatio_5dcd07_gist'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:40
+
+import apt_app.models
+import django.contrib.gis.db.models.fields
+import django.contrib.gis.db.models.functions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0028_datasetversion_amenities'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transitroute',
+            name='geometry_5m',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.gis.db.models.functions.Transform(apt_app.models.SimplifyPreserveTopology(django.contrib.gis.db.models.functions.Transform('geometry', 32616), 5), 4326), output_field=django.contrib.gis.db.models.fields.MultiLineStringField()),
+        ),
+        migrations.AddField(
+            model_name='transitroute',
+            name='geometry_20m',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.gis.db.models.functions.Transform(apt_app.models.SimplifyPreserveTopology(django.contrib.gis.db.models.functions.Transform('geometry', 32616), 20), 4326), output_field=django.contrib.gis.db.models.fields.MultiLineStringField()),
+        ),
+        migrations.AddField(
+            model_name='transitroute',
+            name='geometry_80m',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.gis.db.models.functions.Transform(apt_app.models.SimplifyPreserveTopology(django.contrib.gis.db.models.functions.Transform('geometry', 32616), 80), 4326), output_field=django.contrib.gis.db.models.fields.MultiLineStringField()),
+        ),
+    ]
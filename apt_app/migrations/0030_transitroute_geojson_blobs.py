@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0029_transitroute_simplified_geometry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transitroute',
+            name='geojson_blobs',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
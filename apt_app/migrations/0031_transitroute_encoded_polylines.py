@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0030_transitroute_geojson_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transitroute',
+            name='encoded_polylines',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE apt_app_transitroute AS route
+                SET encoded_polylines = jsonb_build_object(
+                    'geometry', ARRAY(
+                        SELECT ST_AsEncodedPolyline(line.geom, 5)
+                        FROM ST_Dump(route.geometry) AS line ORDER BY line.path
+                    ),
+                    'geometry_5m', ARRAY(
+                        SELECT ST_AsEncodedPolyline(line.geom, 5)
+                        FROM ST_Dump(route.geometry_5m) AS line ORDER BY line.path
+                    ),
+                    'geometry_20m', ARRAY(
+                        SELECT ST_AsEncodedPolyline(line.geom, 5)
+                        FROM ST_Dump(route.geometry_20m) AS line ORDER BY line.path
+                    ),
+                    'geometry_80m', ARRAY(
+                        SELECT ST_AsEncodedPolyline(line.geom, 5)
+                        FROM ST_Dump(route.geometry_80m) AS line ORDER BY line.path
+                    )
+                )
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
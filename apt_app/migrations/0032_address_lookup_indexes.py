@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:05
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0031_transitroute_encoded_polylines'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inspectionsummary',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('address'), name='text_pattern_ops'), name='insp_summary_address_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inspectionsummary',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['address'], name='insp_summary_address_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='violation',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('address'), name='text_pattern_ops'), name='violation_address_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='violation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['address'], name='violation_address_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
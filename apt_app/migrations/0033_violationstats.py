@@ -0,0 +1,58 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0032_address_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViolationStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('total_violations_count', models.PositiveIntegerField()),
+                ('total_inspections_count', models.PositiveIntegerField()),
+                ('trivial_violations_count', models.PositiveIntegerField()),
+                ('trivial_inspections_count', models.PositiveIntegerField()),
+                ('address', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='violation_stats', to='apt_app.address')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('address', 'start_date'), name='violationstats_address_start_date')],
+            },
+        ),
+        # Same counts as ViolationStats.refresh(), with the start dates and trivial codes
+        # of config/constants.json and scripts/inspections_utils.py
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO apt_app_violationstats (
+                    address_id,
+                    start_date,
+                    total_violations_count,
+                    total_inspections_count,
+                    trivial_violations_count,
+                    trivial_inspections_count
+                )
+                SELECT
+                    violation.address_obj_id,
+                    cutoff.start_date,
+                    COUNT(*),
+                    COUNT(DISTINCT violation.violation_date),
+                    COUNT(*) FILTER (WHERE violation.violation_code IN ('CN190019', 'CN193305', 'CN190029')),
+                    COUNT(DISTINCT violation.violation_date)
+                        FILTER (WHERE violation.violation_code IN ('CN190019', 'CN193305', 'CN190029'))
+                FROM apt_app_violation AS violation
+                JOIN (VALUES (DATE '2020-01-01')) AS cutoff (start_date)
+                    ON violation.violation_date > cutoff.start_date
+                WHERE violation.address_obj_id IS NOT NULL
+                    AND violation.inspection_category IN ('COMPLAINT', 'PERIODIC')
+                GROUP BY violation.address_obj_id, cutoff.start_date
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0033_violationstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='violation',
+            name='is_trivial',
+            field=models.BooleanField(default=False),
+        ),
+        # Codes of scripts/inspections_utils.py TRIVIAL_VIOLATION_CODES
+        migrations.RunSQL(
+            sql="""
+                UPDATE apt_app_violation
+                SET is_trivial = violation_code IN ('CN190019', 'CN193305', 'CN190029')
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='violation',
+            index=models.Index(condition=models.Q(('inspection_category__in', ['COMPLAINT', 'PERIODIC']), ('is_trivial', False)), fields=['address_obj', 'violation_date'], name='violation_nontrivial_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='violation',
+            index=models.Index(condition=models.Q(('inspection_category__in', ['COMPLAINT', 'PERIODIC']), ('is_trivial', True)), fields=['address_obj', 'violation_date'], name='violation_trivial_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apt_app', '0034_violation_is_trivial'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='transitroute',
+            name='encoded_polylines',
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.gis.geos import Point
 from django.core.exceptions import ValidationError
+from .addresses import canonicalize_address
 
 
 class LocationMixin:
@@ -10,3 +11,48 @@ class LocationMixin:
             self.location = Point(lon, lat, srid=srid)
         except (TypeError, ValueError):
             raise ValidationError("Invalid latitude/longitude values")
+
+
+class CanonicalAddressMixin:
+    """
+    Keep `canonical_address` and the `address_obj` foreign key (to Address) in sync with
+    `address` whenever the model is saved.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # canonical_address the row was read with (not set when the field is deferred)
+        instance._loaded_canonical_address = instance.__dict__.get("canonical_address")
+        return instance
+
+    def set_canonical_address(self):
+        self.canonical_address = canonicalize_address(self.address)
+
+    def set_address_obj(self):
+        """Link the row to its Address, creating the Address if needed."""
+        if not self.canonical_address:
+            self.address_obj = None
+            return
+        field = self._meta.get_field("address_obj")
+        # Skip the lookup when already linked to the Address of canonical_address: the
+        # loaded Address, or else the canonical_address the row was read or saved with
+        if self.address_obj_id is not None:
+            if field.is_cached(self):
+                linked_canonical = self.address_obj.canonical
+            else:
+                linked_canonical = getattr(self, "_loaded_canonical_address", None)
+            if linked_canonical == self.canonical_address:
+                return
+        self.address_obj, _ = field.related_model.objects.get_or_create(
+            canonical=self.canonical_address
+        )
+
+    def save(self, *args, **kwargs):
+        self.set_canonical_address()
+        self.set_address_obj()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "address" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "canonical_address", "address_obj"}
+        super().save(*args, **kwargs)
+        self._loaded_canonical_address = self.canonical_address
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import connection, models, transaction
 from django.contrib.auth.models import (
     AbstractBaseUser,
     PermissionsMixin,
@@ -10,14 +10,54 @@ from django.utils import timezone
 from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.gis.db import models as gis_models
-from django.contrib.postgres.indexes import GistIndex
-from .mixins import LocationMixin
+from django.contrib.gis.db.models.functions import GeoFunc, Transform
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GistIndex, GinIndex, OpClass
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Q
+from django.db.models.functions import Upper
+from .mixins import CanonicalAddressMixin, LocationMixin
+import json
 
 USERNAME_REQUIRED = settings.DJOK_USER_TYPE == "username"
 EMAIL_REQUIRED = settings.DJOK_USER_TYPE.startswith("email")
 if not (USERNAME_REQUIRED or EMAIL_REQUIRED):
     raise ValueError("Must set DJOK_USER_TYPE")
 
+# UTM zone 16N (meters). Walking-radius queries run planar ST_DWithin / ST_Distance on
+# the `location_utm` companion columns, which use their GiST index, instead of spheroid
+# math per row on the 4326 `location` columns.
+PROJECTED_SRID = 32616
+
+
+def projected_location_field():
+    """`location` in PROJECTED_SRID, computed by the database on every insert and update."""
+    return models.GeneratedField(
+        expression=Transform("location", PROJECTED_SRID),
+        output_field=gis_models.PointField(srid=PROJECTED_SRID),
+        db_persist=True,
+    )
+
+
+class SimplifyPreserveTopology(GeoFunc):
+    """ST_SimplifyPreserveTopology(geometry, tolerance), which Django does not wrap"""
+
+    arity = 2
+
+
+def simplified_geometry_field(tolerance: int):
+    """
+    `geometry` simplified with a tolerance in meters (simplified in PROJECTED_SRID, stored
+    in 4326), computed by the database on every insert and update.
+    """
+    return models.GeneratedField(
+        expression=Transform(
+            SimplifyPreserveTopology(Transform("geometry", PROJECTED_SRID), tolerance), 4326
+        ),
+        output_field=gis_models.MultiLineStringField(),
+        db_persist=True,
+    )
+
 
 class OkUserManager(UserManager):
     def create_superuser(self, **kwargs):
@@ -90,11 +130,84 @@ class User(AbstractBaseUser, PermissionsMixin):
 # --- Custom models ---
 
 
-class SavedProperty(models.Model):
+class AddressManager(models.Manager):
+    def ids_for(self, canonical_addresses, batch_size=5000) -> dict:
+        """
+        Return {canonical address: Address id}, creating the missing addresses in bulk.
+        Used by the bulk ingestion paths, where save() (and CanonicalAddressMixin) is skipped.
+        """
+        canonical_addresses = sorted({a for a in canonical_addresses if a})
+        ids = {}
+        for start in range(0, len(canonical_addresses), batch_size):
+            chunk = canonical_addresses[start : start + batch_size]
+            self.bulk_create([self.model(canonical=a) for a in chunk], ignore_conflicts=True)
+            ids.update(self.filter(canonical__in=chunk).values_list("canonical", "id"))
+        return ids
+
+
+class StreetAddressQuerySet(models.QuerySet):
+    """
+    Lookups on the raw `address` column, answered by the indexes of the model:
+    UPPER(address) with text_pattern_ops for prefixes, and a pg_trgm GIN index for
+    similarity (see street_address_indexes).
+    """
+
+    def address_startswith(self, prefix: str):
+        """Rows whose address starts with `prefix`, ignoring case"""
+        # UPPER(address) LIKE UPPER('prefix%'), a range scan of the UPPER(address) index
+        return self.filter(address__istartswith=prefix)
+
+    def similar_address(self, address: str, min_similarity: float):
+        """
+        Rows whose address is similar to `address` (trigram similarity), most similar
+        first, with the same house number when `address` has one.
+        """
+        words = address.split()
+        queryset = self
+        if words and words[0].isdigit():
+            queryset = queryset.address_startswith(f"{words[0]} ")
+        return (
+            # `%` operator (pg_trgm.similarity_threshold), which uses the GIN index
+            queryset.filter(address__trigram_similar=address)
+            .annotate(similarity=TrigramSimilarity("address", address))
+            .filter(similarity__gte=min_similarity)
+            .order_by("-similarity")
+        )
+
+
+def street_address_indexes(prefix: str) -> list:
+    """Indexes of the `address` column used by StreetAddressQuerySet"""
+    return [
+        models.Index(
+            OpClass(Upper("address"), name="text_pattern_ops"), name=f"{prefix}_address_upper_idx"
+        ),
+        GinIndex(fields=["address"], name=f"{prefix}_address_trgm", opclasses=["gin_trgm_ops"]),
+    ]
+
+
+def latest_cached_response(data):
+    """
+    Unwrap a versioned Property.bus_stops / Property.groceries cache
+    ({"version": ..., "walking_times": {"15": response}}) into the response for the
+    longest cached walking time. Other (legacy) shapes are returned unchanged.
+    """
+    if isinstance(data, dict) and "walking_times" in data:
+        walking_times = data["walking_times"] or {}
+        if not walking_times:
+            return None
+        return walking_times[max(walking_times, key=int)]
+    return data
+
+
+class SavedProperty(CanonicalAddressMixin, models.Model):
     id = models.AutoField(primary_key=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="saved_properties")
     property_obj = models.ForeignKey("Property", on_delete=models.CASCADE)
     address = models.CharField(max_length=512, null=False, blank=False, default="Unknown Address")
+    canonical_address = models.CharField(max_length=255, db_index=True, default="", editable=False)
+    address_obj = models.ForeignKey(
+        "Address", on_delete=models.PROTECT, null=True, blank=True, related_name="saved_properties"
+    )
     custom_name = models.CharField(max_length=512, null=True, blank=True)
     date_saved = models.DateTimeField(auto_now_add=True)
     remarks = models.TextField(null=True, blank=True)
@@ -146,7 +259,7 @@ class SavedProperty(models.Model):
 
         try:
             # Access the features array from the bus_stops_geojson structure
-            bus_data = self.property_obj.bus_stops
+            bus_data = latest_cached_response(self.property_obj.bus_stops)
 
             # Handle the case where bus stops might be stored as bus_stops_geojson
             if isinstance(bus_data, dict) and "bus_stops_geojson" in bus_data:
@@ -195,7 +308,7 @@ class SavedProperty(models.Model):
             return []
 
         try:
-            bus_data = self.property_obj.bus_stops
+            bus_data = latest_cached_response(self.property_obj.bus_stops)
 
             if isinstance(bus_data, dict) and "bus_stops_geojson" in bus_data:
                 features = bus_data["bus_stops_geojson"].get("features", [])
@@ -244,7 +357,7 @@ class SavedProperty(models.Model):
             return result
 
         try:
-            bus_data = self.property_obj.bus_stops
+            bus_data = latest_cached_response(self.property_obj.bus_stops)
             # Accounting for geojson data structure
             if isinstance(bus_data, dict) and "bus_stops_geojson" in bus_data:
                 features = bus_data["bus_stops_geojson"].get("features", [])
@@ -306,7 +419,7 @@ class SavedProperty(models.Model):
             return result
 
         try:
-            grocery_data = self.property_obj.groceries
+            grocery_data = latest_cached_response(self.property_obj.groceries)
 
             # Handling geojson data structure
             if isinstance(grocery_data, dict) and "grocery_geojson" in grocery_data:
@@ -353,19 +466,200 @@ class SavedProperty(models.Model):
             return result
 
 
-class Property(LocationMixin, models.Model):
+class Address(models.Model):
+    """
+    Canonical street address (see apt_app/addresses.py), so that properties, violations,
+    inspection summaries and saved properties are joined on an integer key.
+    """
+
+    id = models.AutoField(primary_key=True)
+    canonical = models.CharField(max_length=255, unique=True)
+
+    objects = AddressManager()
+
+    def __str__(self):
+        return self.canonical
+
+
+# Set one walking time of a Property cache field in place, so that concurrent requests
+# for other walking times keep their entries. A cache of another version is replaced.
+SET_CACHED_RESPONSE_SQL = """
+    UPDATE apt_app_property
+    SET {field} = CASE
+        WHEN {field} ->> 'version' = %(version)s::text
+            AND jsonb_typeof({field} -> 'walking_times') = 'object'
+        THEN jsonb_set(
+            {field}, ARRAY['walking_times', %(walking_time)s::text], %(response)s::jsonb
+        )
+        ELSE jsonb_build_object(
+            'version', %(version)s::int,
+            'walking_times', jsonb_build_object(%(walking_time)s::text, %(response)s::jsonb)
+        )
+    END
+    WHERE id = %(id)s
+"""
+
+
+class Property(LocationMixin, CanonicalAddressMixin, models.Model):
     id = models.AutoField(primary_key=True)
     address = models.CharField(max_length=255)
+    canonical_address = models.CharField(max_length=255, default="", editable=False)
+    address_obj = models.ForeignKey(
+        "Address", on_delete=models.PROTECT, null=True, blank=True, related_name="properties"
+    )
     location = gis_models.PointField()
+    location_utm = projected_location_field()
     created_at = models.DateTimeField(auto_now_add=True)
-    bus_stops = models.JSONField(null=True, blank=True)
+    # Read-through caches: {"version": dataset version, "walking_times": {"15": response}}
+    bus_stops = models.JSONField(null=True, blank=True)  # bus stop data cache
     groceries = models.JSONField(null=True, blank=True)  # grocery data cache
 
     class Meta:
-        indexes = [GistIndex(fields=["location"])]
+        indexes = [
+            GistIndex(fields=["location"]),
+            GistIndex(fields=["location_utm"], name="property_location_utm_gist"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["canonical_address"], name="unique_property_canonical_address"
+            )
+        ]
+
+    def get_cached_response(self, field, version, walking_time):
+        """
+        Return the cached response of `field` ("bus_stops" or "groceries") for a walking
+        time, or None if it is missing or was computed from another dataset version.
+        """
+        cache = getattr(self, field)
+        if not isinstance(cache, dict) or cache.get("version") != version:
+            return None
+        return (cache.get("walking_times") or {}).get(str(walking_time))
+
+    def set_cached_response(self, field, version, walking_time, response):
+        """
+        Cache the response of `field` for a walking time, dropping stale versions. Only
+        that walking time is written (jsonb_set), the row is not re-saved from memory.
+        """
+        cache = getattr(self, field)
+        if not isinstance(cache, dict) or cache.get("version") != version:
+            cache = {"version": version, "walking_times": {}}
+        cache["walking_times"][str(walking_time)] = response
+        setattr(self, field, cache)
+
+        model_field = self._meta.get_field(field)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                SET_CACHED_RESPONSE_SQL.format(field=connection.ops.quote_name(model_field.column)),
+                {
+                    "id": self.pk,
+                    "version": version,
+                    "walking_time": str(walking_time),
+                    "response": json.dumps(response, cls=model_field.encoder),
+                },
+            )
+
+
+class DatasetName(models.TextChoices):
+    TRANSIT = "transit", "Transit stops and routes"
+    GROCERIES = "groceries", "Grocery stores"
+    INSPECTIONS = "inspections", "Building violations and inspection summaries"
+    AMENITIES = "amenities", "Amenities of every type"
+
+
+# Same statement in airflow/dags/groceries_elt.py, which does not go through Django
+BUMP_DATASET_VERSION_SQL = """
+    INSERT INTO apt_app_datasetversion (name, version, updated_at) VALUES (%s, 1, NOW())
+    ON CONFLICT (name) DO UPDATE
+    SET version = apt_app_datasetversion.version + 1, updated_at = NOW()
+    RETURNING version
+"""
+
+
+class DatasetVersion(models.Model):
+    """
+    Version of a reloadable dataset, bumped by the import scripts, the ingest commands
+    and the grocery DAG.
+    Caches computed from a dataset store its version and are stale once it changes.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True, choices=DatasetName.choices)
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+    @classmethod
+    def current(cls, name) -> int:
+        """Current version of a dataset, 0 if it was never bumped."""
+        return cls.objects.filter(name=name).values_list("version", flat=True).first() or 0
+
+    @classmethod
+    def bump(cls, name) -> int:
+        """Increment the version of a dataset (after reloading it) in a single upsert."""
+        with connection.cursor() as cursor:
+            cursor.execute(BUMP_DATASET_VERSION_SQL, [name])
+            return cursor.fetchone()[0]
+
+
+class GeocodeCache(models.Model):
+    """
+    Result of a censusgeocode lookup, keyed by the normalized raw user input so
+    that repeated searches for the same address do not call the Census geocoder.
+    """
+
+    query = models.CharField(max_length=512, unique=True)
+    matched_address = models.CharField(max_length=255)
+    longitude = models.FloatField()
+    latitude = models.FloatField()
+    in_chicago = models.BooleanField()
+    cached_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.query} -> {self.matched_address}"
+
+    def is_expired(self, ttl):
+        """Check if the entry is older than the given timedelta."""
+        return self.cached_at < timezone.now() - ttl
+
+
+class AddressPoint(LocationMixin, models.Model):
+    """
+    City of Chicago address points, used as a local geocoder before falling back
+    to censusgeocode. Loaded with the `ingest_address_points` command.
+    """
+
+    id = models.AutoField(primary_key=True)
+    address = models.CharField(max_length=255)  # street line in uppercase
+    zip_code = models.CharField(max_length=10, blank=True, default="")
+    location = gis_models.PointField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["address"], name="addresspoint_address_idx"),
+            GinIndex(
+                fields=["address"], name="addresspoint_address_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ]
+
+    def __str__(self):
+        return self.address
+
+    @property
+    def matched_address(self):
+        """Format the address point like a censusgeocode matched address."""
+        parts = [self.address, "CHICAGO", "IL"]
+        if self.zip_code:
+            parts.append(self.zip_code)
+        return ", ".join(parts)
+
+
+# Inspection categories counted by /fetch_inspections/
+# TODO: might want to parameterize this in the future
+INSPECTION_CATEGORIES = ["COMPLAINT", "PERIODIC"]
 
 
-class Violation(models.Model):
+class Violation(CanonicalAddressMixin, models.Model):
     violation_id = models.CharField(max_length=10, primary_key=True)
     violation_last_modified_date = models.DateField()
     violation_date = models.DateField()
@@ -383,6 +677,10 @@ class Violation(models.Model):
     inspection_category = models.CharField(max_length=20)  # NOTE
     department_bureau = models.CharField(max_length=50)
     address = models.CharField(max_length=100)
+    canonical_address = models.CharField(max_length=255, db_index=True, default="", editable=False)
+    address_obj = models.ForeignKey(
+        "Address", on_delete=models.PROTECT, null=True, blank=True, related_name="violations"
+    )
     street_number = models.IntegerField()
     street_direction = models.CharField(max_length=5)
     street_name = models.CharField(max_length=20)
@@ -392,6 +690,98 @@ class Violation(models.Model):
     latitude = models.FloatField()
     longitude = models.FloatField()
     location = gis_models.PointField()
+    # Code in scripts.inspections_utils.TRIVIAL_VIOLATION_CODES (e.g. inspector having no
+    # entry), set at ingestion by create_one_violation_object
+    is_trivial = models.BooleanField(default=False)
+
+    objects = StreetAddressQuerySet.as_manager()
+
+    class Meta:
+        indexes = street_address_indexes("violation") + [
+            # Violations counted by /fetch_inspections/ and summarized, per address
+            models.Index(
+                fields=["address_obj", "violation_date"],
+                condition=Q(is_trivial=False, inspection_category__in=INSPECTION_CATEGORIES),
+                name="violation_nontrivial_idx",
+            ),
+            models.Index(
+                fields=["address_obj", "violation_date"],
+                condition=Q(is_trivial=True, inspection_category__in=INSPECTION_CATEGORIES),
+                name="violation_trivial_idx",
+            ),
+        ]
+
+
+# Counts per address and start date, see ViolationStats
+REFRESH_VIOLATION_STATS_SQL = """
+    INSERT INTO apt_app_violationstats (
+        address_id,
+        start_date,
+        total_violations_count,
+        total_inspections_count,
+        trivial_violations_count,
+        trivial_inspections_count
+    )
+    SELECT
+        violation.address_obj_id,
+        cutoff.start_date,
+        COUNT(*),
+        COUNT(DISTINCT violation.violation_date),
+        COUNT(*) FILTER (WHERE violation.is_trivial),
+        COUNT(DISTINCT violation.violation_date) FILTER (WHERE violation.is_trivial)
+    FROM apt_app_violation AS violation
+    JOIN UNNEST(%(start_dates)s::date[]) AS cutoff (start_date)
+        ON violation.violation_date > cutoff.start_date
+    WHERE violation.address_obj_id IS NOT NULL
+        AND violation.inspection_category = ANY(%(categories)s)
+    GROUP BY violation.address_obj_id, cutoff.start_date
+"""
+
+
+class ViolationStats(models.Model):
+    """
+    Violation counts of /fetch_inspections/ per address and start date, over the
+    INSPECTION_CATEGORIES, so that the endpoint reads one row instead of counting raw
+    violations. Rebuilt by `refresh()` at the end of `ingest_raw_violations`.
+    An address without a row has no violation after that start date.
+    """
+
+    address = models.ForeignKey("Address", on_delete=models.CASCADE, related_name="violation_stats")
+    start_date = models.DateField()
+    total_violations_count = models.PositiveIntegerField()
+    total_inspections_count = models.PositiveIntegerField()  # distinct violation dates
+    trivial_violations_count = models.PositiveIntegerField()
+    trivial_inspections_count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["address", "start_date"], name="violationstats_address_start_date"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.address_id} since {self.start_date}"
+
+    @classmethod
+    def refresh(cls, start_dates) -> int:
+        """
+        Rebuild the counts of every address after violations are ingested.
+        DELETE (not TRUNCATE) and INSERT in one transaction, so the endpoint keeps reading
+        the previous counts until the new ones are committed.
+
+        Inputs:
+            start_dates (iterable of datetime.date): start dates to count from.
+
+        Returns (int): number of rows.
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("DELETE FROM apt_app_violationstats")
+            cursor.execute(
+                REFRESH_VIOLATION_STATS_SQL,
+                {"start_dates": list(start_dates), "categories": INSPECTION_CATEGORIES},
+            )
+            return cursor.rowcount
 
 
 class Inspection(models.Model):
@@ -402,14 +792,27 @@ class Inspection(models.Model):
     notes = models.TextField()
 
 
-class InspectionSummary(models.Model):
+class InspectionSummary(CanonicalAddressMixin, models.Model):
     address = models.CharField(max_length=255)
+    canonical_address = models.CharField(max_length=255, db_index=True, default="", editable=False)
+    address_obj = models.ForeignKey(
+        "Address",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="inspection_summaries",
+    )
     summary = models.JSONField()
     property = models.ForeignKey(Property, on_delete=models.CASCADE, null=True, blank=True)
     version = models.CharField(max_length=50, blank=True, null=True, default="")
     last_updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = StreetAddressQuerySet.as_manager()
+
+    class Meta:
+        indexes = street_address_indexes("insp_summary")
+
 
 class CrimeType(models.TextChoices):
     OFFENSE_INVOLVING_CHILDREN = (
@@ -465,6 +868,7 @@ class CrimeType(models.TextChoices):
 class Crime(LocationMixin, models.Model):
     id = models.AutoField(primary_key=True)
     location = gis_models.PointField()
+    location_utm = projected_location_field()
     date = models.DateTimeField()
     type = models.CharField(
         max_length=50, choices=CrimeType.choices, default=CrimeType.NON_CRIMINAL_ALT
@@ -472,7 +876,10 @@ class Crime(LocationMixin, models.Model):
     description = models.TextField()
 
     class Meta:
-        indexes = [GistIndex(fields=["location"])]
+        indexes = [
+            GistIndex(fields=["location"]),
+            GistIndex(fields=["location_utm"], name="crime_location_utm_gist"),
+        ]
 
 
 # --- Abstract base class ---
@@ -480,10 +887,14 @@ class LocationBasedFacilities(LocationMixin, models.Model):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=255)
     location = gis_models.PointField()
+    location_utm = projected_location_field()
 
     class Meta:
         abstract = True
-        indexes = [GistIndex(fields=["location"])]
+        indexes = [
+            GistIndex(fields=["location"]),
+            GistIndex(fields=["location_utm"], name="%(class)s_location_utm_gist"),
+        ]
 
 
 class AmenityType(models.TextChoices):
@@ -500,7 +911,7 @@ class Amenity(LocationBasedFacilities):
     type = models.CharField(max_length=50, choices=AmenityType.choices, default=AmenityType.OTHER)
     address = models.CharField(max_length=255, blank=True, default="")
 
-    class Meta:
+    class Meta(LocationBasedFacilities.Meta):
         constraints = [
             models.UniqueConstraint(fields=["address", "type"], name="unique_address_type")
         ]
@@ -514,8 +925,35 @@ class TransitType(models.TextChoices):
     OTHER = "other", "Other"
 
 
+# Copy the route ids of each stop from the TransitRoute.stops join table
+REFRESH_STOP_ROUTE_IDS_SQL = """
+    UPDATE apt_app_transitstop AS stop
+    SET route_ids = ARRAY(
+        SELECT route_stop.transitroute_id
+        FROM apt_app_transitroute_stops AS route_stop
+        WHERE route_stop.transitstop_id = stop.id
+        ORDER BY route_stop.transitroute_id
+    )
+"""
+
+
 class TransitStop(LocationBasedFacilities):
     type = models.CharField(max_length=50, choices=TransitType.choices, default=TransitType.OTHER)
+    # Sorted ids of the routes serving the stop, denormalized from TransitRoute.stops so
+    # that reads need no join, e.g. TransitStop.objects.filter(route_ids__contains=["171"])
+    route_ids = ArrayField(models.CharField(max_length=20), default=list, blank=True)
+
+    class Meta(LocationBasedFacilities.Meta):
+        indexes = LocationBasedFacilities.Meta.indexes + [
+            GinIndex(fields=["route_ids"], name="transitstop_route_ids_gin"),
+        ]
+
+    @classmethod
+    def refresh_route_ids(cls) -> int:
+        """Rebuild `route_ids` of every stop after the routes or stops are reloaded."""
+        with connection.cursor() as cursor:
+            cursor.execute(REFRESH_STOP_ROUTE_IDS_SQL)
+            return cursor.rowcount
 
 
 class TransitRoute(models.Model):
@@ -523,6 +961,14 @@ class TransitRoute(models.Model):
     name = models.CharField(max_length=255)
     type = models.CharField(max_length=50, choices=TransitType.choices, default=TransitType.OTHER)
     geometry = gis_models.MultiLineStringField()
+    # Lighter versions of the full GTFS shape for lower zoom levels, tolerance in meters
+    # (see ROUTE_GEOMETRY_BY_MIN_ZOOM in apt_app/views/fetch_bus_routes.py)
+    geometry_5m = simplified_geometry_field(5)
+    geometry_20m = simplified_geometry_field(20)
+    geometry_80m = simplified_geometry_field(80)
+    # {geometry column: SHA-256 of its GeoJSON document}, written by the import
+    # (see apt_app/route_blobs.py)
+    geojson_blobs = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     stops = models.ManyToManyField(TransitStop, related_name="routes")
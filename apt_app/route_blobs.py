@@ -0,0 +1,72 @@
+"""
+Content-addressed GeoJSON documents of the bus routes.
+
+Route geometry only changes when the routes are imported, so the import writes the
+response of `/fetch_bus_routes/` for each route alone, at each geometry level (see
+ROUTE_GEOMETRY_BY_MIN_ZOOM), to ROUTE_BLOB_DIR (config/settings.py), named by the
+SHA-256 of its content:
+    <ROUTE_BLOB_DIR>/<sha256>.geojson
+and records the digests in `TransitRoute.geojson_blobs`. `/fetch_bus_routes/` redirects
+single-route requests to them (see `route_blob_redirect`). A blob never changes once
+written, so it is served with `Cache-Control: immutable`, and a route whose geometry did
+not change keeps its URL, and the browser caches, across imports.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from django.conf import settings
+from apt_app.models import TransitRoute
+from apt_app.views.fetch_bus_routes import ROUTE_GEOMETRY_BY_MIN_ZOOM, bus_routes_geojson
+
+
+def blob_path(digest: str) -> Path:
+    """Path of a blob in the store"""
+    return Path(settings.ROUTE_BLOB_DIR) / f"{digest}.geojson"
+
+
+def _write_blob(text: str) -> str:
+    """Store a GeoJSON document under its digest, unless already stored. Returns the digest."""
+    content = text.encode()
+    digest = hashlib.sha256(content).hexdigest()
+    path = blob_path(digest)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+    return digest
+
+
+def write_route_blobs(route_ids=None) -> int:
+    """
+    Write the GeoJSON blobs of the routes and record their digests, after an import.
+    Blobs no longer referenced by any route are deleted when all the routes are written.
+
+    Inputs:
+        route_ids (iterable of str): routes to write, all if None.
+
+    Returns (int): number of routes written.
+    """
+    routes = TransitRoute.objects.only("route_id")
+    if route_ids is not None:
+        routes = routes.filter(route_id__in=route_ids)
+
+    routes = list(routes)
+    for route in routes:
+        route.geojson_blobs = {}
+        for min_zoom, column in ROUTE_GEOMETRY_BY_MIN_ZOOM:
+            text = bus_routes_geojson([route.route_id], min_zoom)
+            route.geojson_blobs[column] = _write_blob(text)
+    TransitRoute.objects.bulk_update(routes, ["geojson_blobs"], batch_size=500)
+
+    if route_ids is None:
+        referenced = {
+            digest
+            for blobs in TransitRoute.objects.values_list("geojson_blobs", flat=True)
+            for digest in blobs.values()
+        }
+        for path in Path(settings.ROUTE_BLOB_DIR).glob("*.geojson"):
+            if path.stem not in referenced:
+                path.unlink(missing_ok=True)
+    return len(routes)
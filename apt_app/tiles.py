@@ -0,0 +1,297 @@
+"""
+Mapbox Vector Tiles of the transit and amenity layers, built inside PostgreSQL.
+
+Each layer is a query with one row per feature (geometry in SRID 4326). `render_tile()`
+keeps the features intersecting a tile (a bounding box test answered by the GiST index
+of the geometry), clips them and snaps them to the tile grid with `ST_AsMVTGeom`, and
+encodes the tile with `ST_AsMVT`. At low zoom a tile covers a large area on the same
+4096 x 4096 grid, so the geometry sent shrinks with the zoom level.
+
+Rendered tiles over Hyde Park (HP_BOUNDS, up to TILE_STORE_MAX_ZOOM) are kept in a tile
+store on disk (TILE_STORE_DIR in config/settings.py):
+    <TILE_STORE_DIR>/<layer>/<dataset versions>/<z>/<x>/<y>.pbf
+so repeat requests are read from a file. Other tiles, and empty ones, are rendered on
+every request and never written, so crawling the tile grid cannot fill the disk. A
+reload of the data bumps the dataset version (see DatasetVersion) and the tiles of the
+previous version are no longer read; `invalidate_tiles()` deletes them. The `seed_tiles`
+command pre-renders Hyde Park.
+
+ref:
+- https://postgis.net/docs/ST_AsMVT.html
+- https://postgis.net/docs/ST_AsMVTGeom.html
+- https://postgis.net/docs/ST_TileEnvelope.html
+"""
+
+import math
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from apt_app.models import DatasetName, DatasetVersion
+from apt_app.views.fetch_bus_routes import route_geometry_column
+from config import load_constants
+
+CONSTANTS = load_constants()
+
+# Tile grid size and the margin (in grid units) kept around each tile so that lines and
+# symbols crossing the tile edges are drawn without seams
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+TILE_MAX_ZOOM = CONSTANTS["TILE_MAX_ZOOM"]
+
+# Area and zoom levels of the tiles kept in the tile store
+TILE_STORE_BOUNDS = CONSTANTS["HP_BOUNDS"]
+TILE_STORE_MAX_ZOOM = CONSTANTS["TILE_STORE_MAX_ZOOM"]
+
+# How long the tile store trusts the dataset versions it last read, so that stored tiles
+# are served without a query. invalidate_tiles() resets them at once.
+TILE_VERSION_TTL_SECONDS = CONSTANTS["TILE_VERSION_TTL_SECONDS"]
+
+TILE_CONTENT_TYPE = "application/vnd.mapbox-vector-tile"
+
+
+@dataclass(frozen=True)
+class TileLayer:
+    sql: str  # one row per feature, with a `geometry` column in SRID 4326
+    attributes: tuple  # columns of `sql` kept as feature attributes in the tile
+    datasets: tuple  # DatasetName of the data in the layer, the tiles are stale once bumped
+    min_zoom: int  # tiles below this zoom are empty, e.g. no stops over the whole city
+    # zoom -> column substituted for {geometry} in `sql`, for layers with simplified levels
+    geometry_column: object = None
+
+
+TILE_LAYERS = {
+    "routes": TileLayer(
+        sql="""
+            SELECT route.route_id, route.name, route.type, route.{geometry} AS geometry
+            FROM apt_app_transitroute AS route
+        """,
+        attributes=("route_id", "name", "type"),
+        datasets=(DatasetName.TRANSIT,),
+        min_zoom=0,
+        # Geometry simplified under the size of a pixel at the zoom of the tile
+        geometry_column=route_geometry_column,
+    ),
+    "stops": TileLayer(
+        sql="""
+            SELECT
+                stop.id,
+                stop.name,
+                stop.type,
+                array_to_string(stop.route_ids, ',') AS route_ids,
+                stop.location AS geometry
+            FROM apt_app_transitstop AS stop
+        """,
+        attributes=("id", "name", "type", "route_ids"),
+        datasets=(DatasetName.TRANSIT,),
+        min_zoom=12,
+    ),
+    "amenities": TileLayer(
+        sql="""
+            SELECT
+                amenity.id,
+                amenity.name,
+                amenity.type,
+                amenity.address,
+                amenity.location AS geometry
+            FROM apt_app_amenity AS amenity
+        """,
+        attributes=("id", "name", "type", "address"),
+        # The grocery DAG updates apt_app_amenity and bumps only `groceries`
+        datasets=(DatasetName.AMENITIES, DatasetName.GROCERIES),
+        min_zoom=12,
+    ),
+}
+
+TILE_SQL = """
+    WITH bounds AS (
+        SELECT
+            ST_TileEnvelope(%(z)s, %(x)s, %(y)s) AS envelope,
+            ST_Transform(
+                ST_TileEnvelope(%(z)s, %(x)s, %(y)s, margin => %(margin)s), 4326
+            ) AS search_area
+    ),
+    tile AS (
+        SELECT
+            {attributes},
+            ST_AsMVTGeom(
+                ST_Transform(layer.geometry, 3857), bounds.envelope, %(extent)s, %(buffer)s
+            ) AS tile_geometry
+        FROM ({layer_sql}) AS layer
+        CROSS JOIN bounds
+        WHERE layer.geometry && bounds.search_area
+    )
+    SELECT ST_AsMVT(tile, %(layer)s, %(extent)s, 'tile_geometry')
+    FROM (SELECT * FROM tile WHERE tile_geometry IS NOT NULL) AS tile
+"""
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    """Whether z/x/y is a tile of the Web Mercator grid, up to TILE_MAX_ZOOM"""
+    return 0 <= z <= TILE_MAX_ZOOM and 0 <= x < 2**z and 0 <= y < 2**z
+
+
+def render_tile(layer: str, z: int, x: int, y: int) -> bytes:
+    """
+    Encode one vector tile of a layer.
+
+    Inputs:
+        layer (str): key of TILE_LAYERS, also the name of the layer in the tile.
+        z, x, y (int): tile coordinates, see `is_valid_tile`.
+
+    Returns (bytes): the tile, empty if no feature is in the tile.
+    """
+    tile_layer = TILE_LAYERS[layer]
+    if z < tile_layer.min_zoom:
+        return b""
+    layer_sql = tile_layer.sql
+    if tile_layer.geometry_column is not None:
+        layer_sql = layer_sql.format(geometry=tile_layer.geometry_column(z))
+    attributes = ", ".join(f"layer.{name}" for name in tile_layer.attributes)
+    sql = TILE_SQL.format(layer_sql=layer_sql, attributes=attributes)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql,
+            {
+                "z": z,
+                "x": x,
+                "y": y,
+                "margin": TILE_BUFFER / TILE_EXTENT,
+                "extent": TILE_EXTENT,
+                "buffer": TILE_BUFFER,
+                "layer": layer,
+            },
+        )
+        tile = cursor.fetchone()[0]
+    return bytes(tile) if tile else b""
+
+
+def tiles_covering(bounds: dict, z: int):
+    """
+    Tiles of zoom z covering a bounding box.
+
+    Inputs:
+        bounds (dict): {"north", "south", "east", "west"} in degrees, e.g. HP_BOUNDS.
+        z (int): zoom level.
+
+    Returns (iterator of tuple[int, int]): x, y of the tiles.
+    """
+    x_min, x_max, y_min, y_max = _tile_range(bounds, z)
+    for x in range(x_min, x_max + 1):
+        for y in range(y_min, y_max + 1):
+            yield x, y
+
+
+def _tile_range(bounds: dict, z: int) -> tuple:
+    """Range of the tiles of zoom z covering a bounding box: x_min, x_max, y_min, y_max"""
+    n = 2**z
+
+    def tile_x(lon):
+        return min(n - 1, int((lon + 180) / 360 * n))
+
+    def tile_y(lat):
+        lat = math.radians(lat)
+        return min(n - 1, int((1 - math.asinh(math.tan(lat)) / math.pi) / 2 * n))
+
+    return (
+        tile_x(bounds["west"]),
+        tile_x(bounds["east"]),
+        tile_y(bounds["north"]),
+        tile_y(bounds["south"]),
+    )
+
+
+def is_stored_tile(z: int, x: int, y: int) -> bool:
+    """Whether a tile is kept in the tile store: over TILE_STORE_BOUNDS, up to its max zoom"""
+    if z > TILE_STORE_MAX_ZOOM:
+        return False
+    x_min, x_max, y_min, y_max = _tile_range(TILE_STORE_BOUNDS, z)
+    return x_min <= x <= x_max and y_min <= y <= y_max
+
+
+def _version_cache_key(dataset) -> str:
+    return f"tile_store_version:{dataset}"
+
+
+def layer_version(layer: str) -> str:
+    """
+    Versions of the datasets of a layer, e.g. "amenities3-groceries12", which name the
+    directory of its current tiles in the store.
+    """
+    parts = []
+    for dataset in sorted(TILE_LAYERS[layer].datasets):
+        version = cache.get_or_set(
+            _version_cache_key(dataset),
+            lambda: DatasetVersion.current(dataset),
+            TILE_VERSION_TTL_SECONDS,
+        )
+        parts.append(f"{dataset}{version}")
+    return "-".join(parts)
+
+
+def tile_path(layer: str, version: str, z: int, x: int, y: int) -> Path:
+    """Path of a tile in the store"""
+    return Path(settings.TILE_STORE_DIR) / layer / version / str(z) / str(x) / f"{y}.pbf"
+
+
+def _write_tile(path: Path, tile: bytes) -> None:
+    """Write a tile atomically, so that concurrent readers never see a partial file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(tile)
+    os.replace(tmp_path, path)
+
+
+def get_tile(layer: str, z: int, x: int, y: int, refresh: bool = False):
+    """
+    Tile of a layer from the store, rendered and stored on a miss. Tiles outside the
+    store (see `is_stored_tile`) and empty tiles are rendered but not written.
+
+    Inputs:
+        layer, z, x, y: see `render_tile`.
+        refresh (bool): render the tile again even if it is stored.
+
+    Returns (tuple[bytes, bool]): the tile and whether it was read from the store.
+    """
+    if not is_stored_tile(z, x, y):
+        return render_tile(layer, z, x, y), False
+    path = tile_path(layer, layer_version(layer), z, x, y)
+    if not refresh:
+        try:
+            return path.read_bytes(), True
+        except FileNotFoundError:
+            pass
+    tile = render_tile(layer, z, x, y)
+    if tile:
+        _write_tile(path, tile)
+    return tile, False
+
+
+def invalidate_tiles(datasets=None) -> int:
+    """
+    Delete the stored tiles of the layers built from the given datasets, except those of
+    the current dataset versions, after a reload of the data.
+
+    Inputs:
+        datasets (iterable of DatasetName): reloaded datasets, all the layers if None.
+
+    Returns (int): number of deleted tile sets (one per layer and version).
+    """
+    datasets = set(DatasetName) if datasets is None else set(datasets)
+    for dataset in datasets:
+        cache.delete(_version_cache_key(dataset))
+
+    deleted = 0
+    for layer, tile_layer in TILE_LAYERS.items():
+        layer_dir = Path(settings.TILE_STORE_DIR) / layer
+        if datasets.isdisjoint(tile_layer.datasets) or not layer_dir.is_dir():
+            continue
+        current = layer_version(layer)
+        for version_dir in layer_dir.iterdir():
+            if version_dir.name != current:
+                shutil.rmtree(version_dir, ignore_errors=True)
+                deleted += 1
+    return deleted
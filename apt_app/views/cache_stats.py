@@ -0,0 +1,11 @@
+from django.http import JsonResponse
+from apt_app.cache import cache_stats
+
+
+def _cache_stats(request):
+    """Hit/miss counters of the cached fetch_* endpoints, for staff users only"""
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+    if not request.user.is_staff:
+        return JsonResponse({"error": "Staff only"}, status=403)
+    return JsonResponse(cache_stats())
@@ -1,4 +1,5 @@
 from django.http import JsonResponse
+from apt_app.addresses import canonicalize_address
 from apt_app.models import SavedProperty
 
 
@@ -15,7 +16,9 @@ def _check_property_status(request):
 
     # Checking if the property exists in the user's saved properties
     is_saved = SavedProperty.objects.filter(
-        user=request.user, address=property_address.upper(), is_deleted=False
+        user=request.user,
+        address_obj__canonical=canonicalize_address(property_address),
+        is_deleted=False,
     ).exists()
 
     return JsonResponse({"is_saved": is_saved, "property_address": property_address})
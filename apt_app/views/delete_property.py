@@ -1,6 +1,7 @@
 import re
 from django.shortcuts import render
 from django.http import HttpResponse
+from apt_app.addresses import canonicalize_address
 from apt_app.models import SavedProperty
 
 
@@ -18,9 +19,10 @@ def _delete_property(request):
             return HttpResponse("Property address is required", status=400)
 
         # Finding the property
-        property_address_upper_case = property_address.upper()
         saved_property = SavedProperty.objects.filter(
-            user=request.user, address=property_address_upper_case, is_deleted=False
+            user=request.user,
+            address_obj__canonical=canonicalize_address(property_address),
+            is_deleted=False,
         ).first()
 
         # Handling the case where the property is not found
@@ -1,11 +1,17 @@
 import os
-import censusgeocode as cg
+import re
+import datetime
 import django  # noqa: E402
-from django.core.exceptions import ValidationError  # noqa: E402
+from django.db import connection  # noqa: E402
 from django.http import JsonResponse  # noqa: E402
+from django.utils import timezone  # noqa: E402
 
-# Import model Property
-from apt_app.models import Property  # noqa: E402
+from django.contrib.postgres.search import TrigramSimilarity  # noqa: E402
+
+# Import models GeocodeCache and AddressPoint
+from apt_app.models import GeocodeCache, AddressPoint  # noqa: E402
+from apt_app.geocoder import CENSUS_GEOCODER, GeocoderUnavailable  # noqa: E402
+from apt_app.addresses import canonicalize_address, is_street_name_variant  # noqa: E402
 from config import load_constants
 
 # Get coordinates related to Hyde Park boundaries
@@ -14,7 +20,30 @@ NORTH = CONSTANTS["HP_BOUNDS"]["north"]
 SOUTH = CONSTANTS["HP_BOUNDS"]["south"]
 EAST = CONSTANTS["HP_BOUNDS"]["east"]
 WEST = CONSTANTS["HP_BOUNDS"]["west"]
-
+GEOCODE_CACHE_TTL = datetime.timedelta(days=CONSTANTS["GEOCODE_CACHE_TTL_DAYS"])
+LOCAL_GEOCODER_MIN_SIMILARITY = CONSTANTS["LOCAL_GEOCODER_MIN_SIMILARITY"]
+# Most similar address points checked for a street name variant of the input
+LOCAL_GEOCODER_CANDIDATES = 10
+
+
+# Create (or find) the Address and the Property of a matched address in one round-trip
+UPSERT_PROPERTY_SQL = """
+    WITH address AS (
+        INSERT INTO apt_app_address (canonical) VALUES (%(canonical)s)
+        ON CONFLICT (canonical) DO UPDATE SET canonical = EXCLUDED.canonical
+        RETURNING id
+    )
+    INSERT INTO apt_app_property (address, canonical_address, address_obj_id, location, created_at)
+    SELECT
+        %(address)s,
+        %(canonical)s,
+        address.id,
+        ST_SetSRID(ST_MakePoint(%(longitude)s, %(latitude)s), 4326),
+        NOW()
+    FROM address
+    ON CONFLICT (canonical_address) DO UPDATE SET address_obj_id = EXCLUDED.address_obj_id
+    RETURNING id
+"""
 
 # Setup Django environment
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
@@ -102,42 +131,161 @@ def match_address_in_chicago(address_input):
     Inputs:
         - address_input (str): Raw address.
 
+    Repeated lookups are served from the GeocodeCache table while the entry is
+    younger than GEOCODE_CACHE_TTL_DAYS. Otherwise the local AddressPoint table is
+    tried, and the Census geocoder is only called when both miss. If the Census
+    geocoder is unavailable, an expired cache entry is served when there is one.
+
     Returns (tuple): tuple with four variables:
         - matched_address (str): address which the raw address was matched with.
         - longitude (float): longitude of the matched address.
         - latitude (float): latitude of the matched address.
     """
-    # Try to match the address using censusgeocode
-    try:
-        result = cg.address(address_input, city="Chicago", state="IL")
-    except Exception as e:
-        return JsonResponse(
-            {"Error": f"Censusgeocode service error: {e}"},
-            status=500,
-        )
-
-    # Check if address is matched to any address
-    ## NOTE: Censusgeocode returns an empty list when the address is not matched
-    if result == []:
-        return JsonResponse(
-            {"Error": "No matched address found in Chicago."},
-            status=400,
-        )
-
-    # Address was matched, get the matched address, urban area, and its coordinates
-    matched_address = result[0].get("matchedAddress")
-    longitude = result[0].get("coordinates", {}).get("x")
-    latitude = result[0].get("coordinates", {}).get("y")
-    urban_area = result[0]["geographies"]["Urban Areas"][0]["BASENAME"]
+    # Serve repeated lookups from the geocode cache before calling the Census geocoder
+    query = normalize_geocode_query(address_input)
+    cached = get_cached_geocode(query)
+
+    # Then try the local address points, which are all inside Chicago
+    if cached is None:
+        address_point = match_address_locally(address_input)
+        if address_point is not None:
+            return (
+                address_point.matched_address,
+                address_point.location.x,
+                address_point.location.y,
+            )
+
+    if cached is None:
+        # Try to match the address using the Census geocoder client, which bounds the
+        # call with a deadline and fails fast while the service is unhealthy
+        try:
+            result = CENSUS_GEOCODER.address(address_input, city="Chicago", state="IL")
+        except GeocoderUnavailable as e:
+            # Serve an expired cache entry, if any, rather than failing the search
+            cached = GeocodeCache.objects.filter(query=query).first()
+            if cached is None:
+                return JsonResponse(
+                    {"Error": f"Censusgeocode service error: {e}"},
+                    status=503,
+                )
+        else:
+            # Check if address is matched to any address
+            ## NOTE: The Census geocoder returns an empty list when the address is not matched
+            if result == []:
+                return JsonResponse(
+                    {"Error": "No matched address found in Chicago."},
+                    status=400,
+                )
+
+            # Address was matched, get the matched address, urban area, and its coordinates
+            matched_address = result[0].get("matchedAddress")
+            longitude = result[0].get("coordinates", {}).get("x")
+            latitude = result[0].get("coordinates", {}).get("y")
+            urban_area = result[0]["geographies"]["Urban Areas"][0]["BASENAME"]
+
+            cached = cache_geocode(
+                query, matched_address, longitude, latitude, urban_area == "Chicago, IL--IN"
+            )
 
     # If address not in chicago, return error message
-    if not urban_area == "Chicago, IL--IN":
+    if not cached.in_chicago:
         return JsonResponse(
             {"Error": "Address is not inside Chicago, the area defined for the project."},
             status=400,
         )
 
-    return matched_address, longitude, latitude
+    return cached.matched_address, cached.longitude, cached.latitude
+
+
+def normalize_geocode_query(address_input):
+    """
+    Normalize a raw address so that trivially different inputs (case, repeated
+    whitespace, spacing around commas) share a single geocode cache entry.
+
+    Inputs:
+        address_input (str): Raw address.
+
+    Returns (str): normalized address used as the cache key.
+    """
+    query = " ".join(address_input.upper().split())
+    query = re.sub(r"\s*,\s*", ", ", query)
+    return query.strip(" ,.")
+
+
+def match_address_locally(address_input):
+    """
+    Match a raw address against the local AddressPoint table. An exact match on
+    the street line is tried first, then the most similar address point (by
+    trigram similarity) that only differs in the spelling of the street name (see
+    `is_street_name_variant`), so that e.g. "E" for "W" or "61ST" for "60TH" is a miss
+    left to the Census geocoder rather than a building across the city.
+
+    Inputs:
+        address_input (str): Raw address.
+
+    Returns (AddressPoint | None): matched address point, None if there is no match.
+    """
+    street_line = canonicalize_address(address_input)
+    words = street_line.split()
+    if not words or not words[0].isdigit():
+        return None
+
+    address_point = AddressPoint.objects.filter(address=street_line).first()
+    if address_point is not None:
+        return address_point
+
+    candidates = (
+        AddressPoint.objects.filter(address__startswith=f"{words[0]} ")
+        .annotate(similarity=TrigramSimilarity("address", street_line))
+        .filter(similarity__gte=LOCAL_GEOCODER_MIN_SIMILARITY)
+        .order_by("-similarity")[:LOCAL_GEOCODER_CANDIDATES]
+    )
+    return next(
+        (point for point in candidates if is_street_name_variant(street_line, point.address)),
+        None,
+    )
+
+
+def get_cached_geocode(query):
+    """
+    Return the cached geocode for a normalized query, or None if there is no
+    entry or the entry is older than GEOCODE_CACHE_TTL.
+
+    Inputs:
+        query (str): normalized address from normalize_geocode_query().
+
+    Returns (GeocodeCache | None): the cached geocode, if still valid.
+    """
+    cached = GeocodeCache.objects.filter(query=query).first()
+    if cached is None or cached.is_expired(GEOCODE_CACHE_TTL):
+        return None
+    return cached
+
+
+def cache_geocode(query, matched_address, longitude, latitude, in_chicago):
+    """
+    Store (or refresh) the censusgeocode result for a normalized query.
+
+    Inputs:
+        query (str): normalized address from normalize_geocode_query().
+        matched_address (str): matched address from censusgeocode.
+        longitude (float): longitude of the matched address.
+        latitude (float): latitude of the matched address.
+        in_chicago (bool): whether the matched address is in the Chicago urban area.
+
+    Returns (GeocodeCache): the stored cache entry.
+    """
+    cached, _ = GeocodeCache.objects.update_or_create(
+        query=query,
+        defaults={
+            "matched_address": matched_address,
+            "longitude": longitude,
+            "latitude": latitude,
+            "in_chicago": in_chicago,
+            "cached_at": timezone.now(),
+        },
+    )
+    return cached
 
 
 def coordinates_in_hyde_park(latitude, longitude):
@@ -165,7 +313,9 @@ def coordinates_in_hyde_park(latitude, longitude):
 
 def save_property_in_django(address_input, latitude, longitude):
     """
-    Helper function that generates a TransitStop instance and saves it.
+    Helper function that creates the Property for a matched address (and its Address)
+    if it does not exist yet, in a single idempotent statement that is safe under
+    concurrent searches for the same address.
 
     Inputs:
         address_input (str): matched address from censusgeocode package.
@@ -174,31 +324,24 @@ def save_property_in_django(address_input, latitude, longitude):
 
     Returns (int): id of the address in the Django data model.
     """
-    property = Property()
-
-    # Check if property already exists in django
-    try:
-        property_exists = Property.objects.filter(address=address_input).get()
-    except Property.DoesNotExist:
-        property_exists = False
-
-    # if exists, return the id and don't continue with function
-    if property_exists:
-        return property_exists.id
-
-    # Name
-    property.address = address_input
-
-    # Location
     try:
-        property.setup_location(latitude, longitude)
-    except ValidationError as e:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError) as e:
         raise ValueError(f"Invalid location: {e}")
 
-    # Save it in django
+    # The no-op DO UPDATE (rather than DO NOTHING) makes RETURNING yield the id of
+    # the existing row on conflict
     try:
-        property.save()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                UPSERT_PROPERTY_SQL,
+                {
+                    "address": address_input,
+                    "canonical": canonicalize_address(address_input),
+                    "longitude": longitude,
+                    "latitude": latitude,
+                },
+            )
+            return cursor.fetchone()[0]
     except Exception as e:
-        raise ValueError(f"{property.address} could not be uploaded: {e}")
-
-    return property.id
+        raise ValueError(f"{address_input} could not be uploaded: {e}")
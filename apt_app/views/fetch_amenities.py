@@ -0,0 +1,172 @@
+import json
+from django.http import JsonResponse
+from django.contrib.gis.geos import Point
+from apt_app.geojson import (
+    fetch_feature_collection,
+    fetch_feature_collections,
+    geojson_response,
+    json_text,
+)
+from apt_app.models import PROJECTED_SRID, AmenityType, Property
+from config import load_constants
+
+CONSTANTS = load_constants()
+WALKING_METERS_PER_MIN = CONSTANTS["WALKING_METERS_PER_MIN"]
+
+# Amenities within the radius: ST_DWithin prefilter and KNN (<->) ordering, both answered
+# by the GiST index of `location_utm` (planar, in meters). LIMIT NULL means no limit.
+AMENITIES_NEAR_SQL = """
+    WITH origin AS (
+        SELECT ST_Transform(
+            ST_SetSRID(ST_MakePoint(%(longitude)s, %(latitude)s), 4326), %(srid)s
+        ) AS point
+    )
+    SELECT
+        amenity.id,
+        amenity.name,
+        amenity.address,
+        amenity.type,
+        amenity.location AS geometry,
+        ROUND((amenity.location_utm <-> origin.point)::numeric / %(meters_per_min)s, 1)
+            AS distance_min,
+        amenity.location_utm <-> origin.point AS distance
+    FROM apt_app_amenity AS amenity
+    CROSS JOIN origin
+    WHERE amenity.type = ANY(%(types)s)
+        AND ST_DWithin(amenity.location_utm, origin.point, %(radius)s)
+    ORDER BY amenity.location_utm <-> origin.point
+    LIMIT %(limit)s
+"""
+
+
+# An empty FeatureCollection, for the requested types without amenities
+EMPTY_FEATURE_COLLECTION = json.dumps({"type": "FeatureCollection", "features": []})
+
+
+def _amenities_near_params(location: Point, types: list, walking_time: int, limit=None):
+    return {
+        "longitude": location.x,
+        "latitude": location.y,
+        "srid": PROJECTED_SRID,
+        "types": list(types),
+        "radius": walking_time * WALKING_METERS_PER_MIN,
+        "meters_per_min": WALKING_METERS_PER_MIN,
+        "limit": limit,
+    }
+
+
+def amenities_geojson(location: Point, types: list, walking_time: int, limit: int = None):
+    """
+    Amenities of the given types within the walking distance of a location, nearest first,
+    as a FeatureCollection built in the database.
+    Feature properties: name, distance_min, address, type.
+
+    Args:
+        location (Point): origin, in SRID 4326.
+        types (list[AmenityType]): amenity types to return.
+        walking_time (int): walking time in minutes.
+        limit (int): only the `limit` nearest amenities (over all the types).
+
+    Returns (tuple[str, int]): FeatureCollection as JSON text and its number of features.
+    """
+    return fetch_feature_collection(
+        AMENITIES_NEAR_SQL,
+        _amenities_near_params(location, types, walking_time, limit),
+        properties=("name", "distance_min", "address", "type"),
+        order_by="distance, id",
+    )
+
+
+def amenities_geojson_by_type(location: Point, types: list, walking_time: int) -> dict:
+    """
+    `amenities_geojson` with one FeatureCollection per amenity type, in one query.
+
+    Returns (dict): {type: (FeatureCollection as JSON text, number of features)} for
+        every requested type, in the requested order.
+    """
+    found = fetch_feature_collections(
+        AMENITIES_NEAR_SQL,
+        _amenities_near_params(location, types, walking_time),
+        properties=("name", "distance_min", "address", "type"),
+        group_by="type",
+        order_by="distance, id",
+    )
+    return {t: found.get(t, (EMPTY_FEATURE_COLLECTION, 0)) for t in types}
+
+
+def _parse_types(in_types: str) -> list:
+    """
+    Parse a comma-separated string of amenity types, all the types if empty.
+    e.g. "pharmacy, grocery" -> ["grocery", "pharmacy"] (in AmenityType order)
+
+    Raises ValueError on an unknown type.
+    """
+    requested = {t.strip().lower() for t in in_types.split(",") if t.strip()}
+    unknown = requested - set(AmenityType.values)
+    if unknown:
+        raise ValueError(f"Unknown amenity types: {', '.join(sorted(unknown))}")
+    return [t for t in AmenityType.values if not requested or t in requested]
+
+
+def _fetch_amenities(
+    geocode: str, property_id: str, types: str = "", walking_time: int = 15
+) -> JsonResponse:
+    """
+    Amenities of several types within the walking distance of a property, in one
+    spatial query, grouped per type.
+
+    Args:
+        geocode (str): "latitude,longitude" of the property.
+        property_id (str): id returned by `fetch_all_data`.
+        types (str): comma-separated amenity types (see AmenityType), all if empty.
+        walking_time (int): walking time in minutes.
+
+    Returns (JsonResponse): {"address", "walking_time", "types", "counts": {type: count},
+        "amenities_geojson": {type: FeatureCollection}}
+    """
+    if not property_id:
+        return JsonResponse({"error": "property_id is required"}, status=400)
+    if not geocode:
+        return JsonResponse({"error": "geocode is required"}, status=400)
+    if walking_time < 0:
+        return JsonResponse({"error": "walking_time must be greater than 0"}, status=400)
+    try:
+        type_list = _parse_types(types)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    try:
+        lat_str, lng_str = geocode.split(",")
+        location = Point(float(lng_str), float(lat_str), srid=4326)
+    except Exception as e:
+        return JsonResponse({"error": f"Failure in parsing request: {str(e)}"}, status=400)
+
+    try:
+        prop = Property.objects.get(id=property_id)
+    except (Property.DoesNotExist, ValueError):
+        return JsonResponse({"error": "Property not found"}, status=404)
+
+    try:
+        text = amenities_json(location, prop, type_list, walking_time)
+    except Exception as e:
+        return JsonResponse({"error": f"Failure in querying amenity data: {str(e)}"}, status=500)
+    return geojson_response(text)
+
+
+def amenities_json(location: Point, prop: Property, types: list, walking_time: int = 15):
+    """
+    Core of `_fetch_amenities`: the amenities near the location grouped per type, as the
+    JSON text of the response. The FeatureCollections built by the database are spliced
+    in as they are, without decoding them.
+
+    Returns (str): JSON text of the response.
+    """
+    groups = amenities_geojson_by_type(location, types, walking_time)
+    header = {
+        "address": prop.address,
+        "walking_time": walking_time,
+        "types": types,
+        "counts": {amenity_type: count for amenity_type, (_, count) in groups.items()},
+    }
+    geojson = json_text({}, **{amenity_type: text for amenity_type, (text, _) in groups.items()})
+    return json_text(header, amenities_geojson=geojson)
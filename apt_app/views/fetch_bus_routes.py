@@ -1,16 +1,42 @@
-from django.core.serializers import serialize
 from django.http import JsonResponse
-from apt_app.models import TransitRoute
-import json
+from django.shortcuts import redirect
+from django.utils.cache import patch_cache_control
+from django.contrib.gis.geos import Point
+from django.contrib.gis.measure import Distance as DistanceRatio
+from apt_app.geojson import fetch_feature_collection, geojson_response
+from apt_app.models import TransitRoute, TransitStop
+from config import load_constants
 
+CONSTANTS = load_constants()
+WALKING_METERS_PER_MIN = CONSTANTS["WALKING_METERS_PER_MIN"]
 
-def _get_hsl_colors(n):
-    return [f"hsl({int(360 * i / n)}, 100%, 45%)" for i in range(n)]
+# Requested routes, in the requested order, with their color. {geometry} is a geometry
+# column of TransitRoute, see ROUTE_GEOMETRY_BY_MIN_ZOOM
+BUS_ROUTES_LAYER_SQL = """
+    SELECT
+        route.route_id,
+        route.name,
+        route.type,
+        requested.color,
+        route.{geometry} AS geometry,
+        requested.position
+    FROM UNNEST(%(route_ids)s::varchar[], %(colors)s::text[])
+        WITH ORDINALITY AS requested (route_id, color, position)
+    JOIN apt_app_transitroute AS route ON route.route_id = requested.route_id
+"""
+
+# Geometry column of TransitRoute used from each zoom level: the simplification
+# tolerance stays under the size of a pixel (~7 m at zoom 14 in Chicago)
+ROUTE_GEOMETRY_BY_MIN_ZOOM = (
+    (16, "geometry"),
+    (14, "geometry_5m"),
+    (12, "geometry_20m"),
+    (0, "geometry_80m"),
+)
 
 
-def _assign_color(feature, route_color_map):
-    feature["properties"]["color"] = route_color_map[feature["properties"]["route_id"]]
-    return feature
+def _get_hsl_colors(n):
+    return [f"hsl({int(360 * i / n)}, 100%, 45%)" for i in range(n)]
 
 
 def _parse_input_routes(in_routes: str) -> list:
@@ -23,29 +49,138 @@ def _parse_input_routes(in_routes: str) -> list:
     return [r.strip() for r in in_routes.split(",")]
 
 
-def _fetch_bus_routes(routes: str):
+def route_geometry_column(zoom: int = None) -> str:
+    """Geometry column of TransitRoute for a map zoom level, full resolution if None"""
+    if zoom is None:
+        return "geometry"
+    for min_zoom, column in ROUTE_GEOMETRY_BY_MIN_ZOOM:
+        if zoom >= min_zoom:
+            return column
+    raise ValueError("zoom must be greater than or equal to 0")
+
+
+def _fetch_bus_routes(routes: str, zoom: str = ""):
+    """
+    GeoJSON of the requested routes. A single route is redirected to its immutable
+    GeoJSON document when the import wrote it, see `route_blob_redirect`.
+
+    Args:
+        routes (str): comma-separated route ids.
+        zoom (str): optional map zoom level, the route geometries are simplified to it.
+    """
     route_num_list = _parse_input_routes(routes)
     if not route_num_list:
         return JsonResponse({"error": "No valid input"}, status=400)
     try:
-        routes_qs = TransitRoute.objects.filter(route_id__in=route_num_list)
-        if not routes_qs:
-            return JsonResponse(
-                {"error": "This route is not available in our database"}, status=400
-            )
-        routes_list = list(routes_qs)
-    except TransitRoute.DoesNotExist as e:
-        return JsonResponse({"error": f"This route does not pass Hyde Park: {e}"}, status=404)
-
-    geojson = serialize(
-        "geojson", routes_list, geometry_field="geometry", fields=("route_id", "name", "type")
+        zoom = int(zoom) if zoom.strip() else None
+        route_geometry_column(zoom)
+    except ValueError as e:
+        return JsonResponse({"error": f"Invalid zoom: {str(e)}"}, status=400)
+
+    if len(set(route_num_list)) == 1:
+        response = route_blob_redirect(route_num_list[0], zoom)
+        if response is not None:
+            return response
+    text = bus_routes_geojson(route_num_list, zoom)
+    if text is None:
+        return JsonResponse({"error": "This route is not available in our database"}, status=400)
+    # Sent as built by PostGIS, without decoding it
+    return geojson_response(text)
+
+
+def route_blob_redirect(route_id: str, zoom: int = None):
+    """
+    Redirect to the GeoJSON document of one route written by the import, see
+    apt_app/route_blobs.py. Its content is the response of `_fetch_bus_routes` for that
+    route alone, so it is only serialized once per import.
+
+    Returns (HttpResponse | None): redirect to `/bus_routes/blobs/<sha256>.geojson`, None
+        if the route or its document is missing.
+    """
+    blobs = TransitRoute.objects.filter(route_id=route_id).values_list("geojson_blobs", flat=True)
+    digest = next(iter(blobs), {}).get(route_geometry_column(zoom))
+    if digest is None:
+        return None
+    response = redirect("bus_route_blob", digest=digest)
+    # The target changes with the next import
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def bus_routes_near(location: Point, walking_time: int = 15):
+    """
+    Routes served by the stops within the walking distance of a location, for the
+    property bundle (the same routes the frontend collects from the bus stops), see
+    `bus_route_colors`.
+
+    Returns (tuple[dict, int]): response content and HTTP status.
+    """
+    stops_route_ids = TransitStop.objects.filter(
+        location_utm__dwithin=(
+            location,
+            DistanceRatio(m=int(walking_time) * WALKING_METERS_PER_MIN),
+        )
+    ).values_list("route_ids", flat=True)
+    route_num_list = sorted({route_id for ids in stops_route_ids for route_id in ids})
+    if not route_num_list:
+        return {"error": "No valid input"}, 400
+    # The map draws the routes from the `routes` vector tiles, so only their ids and
+    # colors are sent, no geometry
+    content = bus_route_colors(route_num_list)
+    if content is None:
+        return {"error": "This route is not available in our database"}, 400
+    return content, 200
+
+
+def bus_routes_geojson(route_num_list: list, zoom: int = None):
+    """
+    FeatureCollection of the given routes, in the given order and with one color per
+    route, built in the database.
+
+    Args:
+        route_num_list (list[str]): route ids.
+        zoom (int): map zoom level the geometries are simplified to, full resolution if None.
+
+    Returns (str | None): FeatureCollection as JSON text, None if no route was found.
+    """
+    route_num_list = list(dict.fromkeys(route_num_list))
+    text, count = fetch_feature_collection(
+        BUS_ROUTES_LAYER_SQL.format(geometry=route_geometry_column(zoom)),
+        {"route_ids": route_num_list, "colors": _get_hsl_colors(len(route_num_list))},
+        properties=("route_id", "name", "type", "color"),
+        order_by="position",
     )
-    data = json.loads(geojson)
-    for feature in data["features"]:
-        feature["properties"]["route_id"] = feature.pop("id")
-    route_color_map = {
-        rid: color for rid, color in zip(route_num_list, _get_hsl_colors(len(route_num_list)))
+    return text if count else None
+
+
+def _requested_routes(route_num_list: list, *fields) -> list:
+    """
+    Fields of the given routes found in the database, in the given order and with the
+    same colors as `bus_routes_geojson`.
+
+    Returns (list[dict]): {"route_id", "color", *fields} per route found.
+    """
+    route_num_list = list(dict.fromkeys(route_num_list))
+    found = {
+        route["route_id"]: route
+        for route in TransitRoute.objects.filter(route_id__in=route_num_list).values(
+            "route_id", *fields
+        )
     }
-    data["features"] = [_assign_color(f, route_color_map) for f in data["features"]]
+    return [
+        found[route_id] | {"color": color}
+        for route_id, color in zip(route_num_list, _get_hsl_colors(len(route_num_list)))
+        if route_id in found
+    ]
 
-    return JsonResponse(data)
+
+def bus_route_colors(route_num_list: list):
+    """
+    Ids, names and colors of the given routes, without geometry: the frontend draws
+    them from the `routes` vector tiles (`/tiles/routes/...`).
+
+    Returns (dict | None): {"routes": [{"route_id", "name", "type", "color"}]}, None if
+        no route was found.
+    """
+    routes = _requested_routes(route_num_list, "name", "type")
+    return {"routes": routes} if routes else None
@@ -1,14 +1,46 @@
+import json
 from django.http import JsonResponse
 from django.contrib.gis.geos import Point
-from django.contrib.gis.measure import Distance as DistanceRatio
-from apt_app.models import TransitStop, Property, TransitRoute
-from django.contrib.gis.db.models.functions import Distance as DistanceFunction
+from apt_app.geojson import fetch_feature_collection, json_text, layer_response
+from apt_app.models import PROJECTED_SRID, DatasetName, DatasetVersion, Property
 from config import load_constants
-from django.db.models import Prefetch
 
 CONSTANTS = load_constants()
 WALKING_METERS_PER_MIN = CONSTANTS["WALKING_METERS_PER_MIN"]
 
+# Nearest stop of each route within the radius (DISTINCT ON over the unnested
+# `route_ids`), then one row per kept stop with all of its routes. A stop is kept iff it
+# is the nearest one for at least one route, i.e. iff it adds a route not served by any
+# closer stop. Distances are planar, in meters, on the projected `location_utm`.
+NEAREST_STOP_PER_ROUTE_SQL = """
+    WITH origin AS (
+        SELECT ST_Transform(
+            ST_SetSRID(ST_MakePoint(%(longitude)s, %(latitude)s), 4326), %(srid)s
+        ) AS point
+    ),
+    nearest_per_route AS (
+        SELECT DISTINCT ON (route_id)
+            stop.id AS stop_id,
+            ST_Distance(stop.location_utm, origin.point) AS distance
+        FROM apt_app_transitstop AS stop
+        CROSS JOIN origin
+        CROSS JOIN LATERAL UNNEST(stop.route_ids) AS route_id
+        WHERE ST_DWithin(stop.location_utm, origin.point, %(radius)s)
+        ORDER BY route_id, distance, stop.id
+    )
+    SELECT
+        stop.id,
+        stop.id::text AS stop_id,
+        stop.name AS stop_name,
+        ROUND(MIN(nearest.distance) / %(meters_per_min)s)::int AS distance_min,
+        stop.route_ids AS routes,
+        stop.location AS geometry,
+        MIN(nearest.distance) AS distance
+    FROM nearest_per_route AS nearest
+    JOIN apt_app_transitstop AS stop ON stop.id = nearest.stop_id
+    GROUP BY stop.id
+"""
+
 
 def _fetch_bus_stops(geocode: str, property_id: str, walking_time: int = 5):
     """Take property location and desired walking distance,
@@ -34,85 +66,87 @@ def _fetch_bus_stops(geocode: str, property_id: str, walking_time: int = 5):
         print(f"error: Failure in parsing request: {str(e)}")
         return JsonResponse({"error": f"Failure in parsing request: {str(e)}"}, status=400)
 
+    # get property object
+    try:
+        prop = Property.objects.get(id=property_id)
+    except Exception as e:
+        return JsonResponse({"error": f"Invalid property_id: {str(e)}"}, status=400)
+
+    content, status, text = bus_stops_response(Point(lat, lon, srid=4326), prop, walking_time)
+    return layer_response(content, status, text)
+
+
+def nearest_stop_per_route(reference_point: Point, radius_meters: float):
+    """
+    Stops within `radius_meters` of the reference point that are the nearest stop of at
+    least one route, closest first, as a FeatureCollection built in the database.
+    Feature properties: stop_name, distance_min, routes (sorted route ids), stop_id.
+
+    Returns (tuple[str, int]): FeatureCollection as JSON text and its number of stops.
+    """
+    return fetch_feature_collection(
+        NEAREST_STOP_PER_ROUTE_SQL,
+        {
+            "longitude": reference_point.x,
+            "latitude": reference_point.y,
+            "radius": radius_meters,
+            "srid": PROJECTED_SRID,
+            "meters_per_min": WALKING_METERS_PER_MIN,
+        },
+        properties=("stop_name", "distance_min", "routes", "stop_id"),
+        order_by="distance, id",
+    )
+
+
+def bus_stops_data(reference_point: Point, prop: Property, walking_time: int = 5):
+    """
+    `bus_stops_response` for the property bundle, which needs the content as a dict.
+
+    Returns (tuple[dict, int]): response content and HTTP status.
+    """
+    content, status, _ = bus_stops_response(reference_point, prop, walking_time)
+    return content, status
+
+
+def bus_stops_response(reference_point: Point, prop: Property, walking_time: int = 5):
+    """
+    Core of `_fetch_bus_stops`: find the stops within the walking distance of the
+    reference point. Responses are cached on the property per walking time and transit
+    dataset version, and served from there on a hit.
+
+    Returns (tuple[dict, int, str | None]): response content, HTTP status and, when the
+        response was just built, its JSON text with the GeoJSON of the database spliced
+        in, so that it is sent without encoding the stops again.
+    """
+    version = DatasetVersion.current(DatasetName.TRANSIT)
+    cached = prop.get_cached_response("bus_stops", version, walking_time)
+    if cached is not None:
+        return cached, 200, None
+
     # borrow code from Miguel's scripts/check_data_cta_ctops.py refactor later
     # Distance in meters, GoogleMaps has a walking time of 4.2 km per hour.
     try:
         walking_time = int(walking_time)
         ratio_in_meters = walking_time * WALKING_METERS_PER_MIN
-        reference_point = Point(lat, lon, srid=4326)
-        # find stops within ratio_in_meters from the reference point
-        all_near_stops = (
-            TransitStop.objects.filter(
-                location__distance_lte=(reference_point, DistanceRatio(m=ratio_in_meters))
-            )
-            .annotate(distance=DistanceFunction("location", reference_point))
-            .prefetch_related(
-                Prefetch(
-                    "routes",
-                    queryset=TransitRoute.objects.only("route_id"),
-                )
-            )
-            .order_by("distance")
-        )
-        seen_routes = set()
-        filtered_stops = []
-        for stop in all_near_stops:
-            stop_routes = set(route.route_id for route in stop.routes.all())
-            new_routes = stop_routes - seen_routes
-            # Only include this stop if it has at least one new route
-            if new_routes:
-                filtered_stops.append(stop)
-                seen_routes.update(new_routes)
-        near_stops = filtered_stops
-        print(near_stops)
+        stops_geojson, stops_count = nearest_stop_per_route(reference_point, ratio_in_meters)
     except Exception as e:
-        return JsonResponse({"error": f"Failure in querying bus stop data: {str(e)}"}, status=400)
-    if not near_stops:
-        return JsonResponse({"error": "No bus stops found within the walking distance"}, status=400)
-
-    # get property object
-    try:
-        prop = Property.objects.get(id=property_id)
-    except Exception as e:
-        return JsonResponse({"error": f"Invalid property_id: {str(e)}"}, status=400)
+        return {"error": f"Failure in querying bus stop data: {str(e)}"}, 400, None
+    if not stops_count:
+        return {"error": "No bus stops found within the walking distance"}, 400, None
 
     # format response
     try:
         clean_address = prop.address
     except Exception as e:
-        return JsonResponse({"error": f"No address info in property table: {str(e)}"}, status=400)
+        return {"error": f"No address info in property table: {str(e)}"}, 400, None
 
+    header = {"address": clean_address, "walking_time": walking_time}
     try:
-        features = []
-        for stop in near_stops:
-            features.append(
-                {
-                    "type": "Feature",
-                    "geometry": {
-                        "type": "Point",
-                        "coordinates": [stop.location.x, stop.location.y],
-                    },
-                    "properties": {
-                        "stop_name": stop.name,
-                        "distance_min": round(stop.distance.m / WALKING_METERS_PER_MIN),  # 70 m/min
-                        "routes": [route.route_id for route in stop.routes.all()],
-                        "stop_id": str(stop.id),
-                    },
-                }
-            )
-        response = {
-            "address": clean_address,
-            "walking_time": walking_time,
-            "bus_stops_geojson": {
-                "type": "FeatureCollection",
-                "features": features,
-            },
-        }
+        # decoded for the cache on the property (a JSONField), the text is sent as is
+        response = header | {"bus_stops_geojson": json.loads(stops_geojson)}
         ## update property table
-        if not prop.bus_stops:
-            prop.bus_stops = response
-            prop.save()
+        prop.set_cached_response("bus_stops", version, walking_time, response)
     except Exception as e:
-        return JsonResponse({"error": f"Failed to update property table: {str(e)}"}, status=400)
+        return {"error": f"Failed to update property table: {str(e)}"}, 400, None
 
-    return JsonResponse(response)
+    return response, 200, json_text(header, bus_stops_geojson=stops_geojson)
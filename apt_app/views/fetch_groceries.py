@@ -1,80 +1,106 @@
+import json
 from django.http import JsonResponse
 from django.views.decorators.http import require_GET
 from django.contrib.gis.geos import Point
-from django.contrib.gis.db.models.functions import Distance
 from django.views.decorators.csrf import csrf_exempt
-from apt_app.models import Amenity, AmenityType, Property
+from apt_app.models import AmenityType, DatasetName, DatasetVersion, Property
+from apt_app.geojson import json_text, layer_response
+from .fetch_amenities import amenities_geojson
 from config import load_constants
 
 CONSTANTS = load_constants()
 WALKING_METERS_PER_MIN = CONSTANTS["WALKING_METERS_PER_MIN"]
 
 
-def _fetch_groceries(geocode: str, property_id: str, walking_time: int = 15) -> JsonResponse:
+def _fetch_groceries(
+    geocode: str, property_id: str, walking_time: int = 15, limit: int = None
+) -> JsonResponse:
     if not property_id:
         return JsonResponse({"error": "property_id is required"}, status=400)
     if not geocode:
         return JsonResponse({"error": "geocode is required"}, status=400)
+    if limit is not None and limit <= 0:
+        return JsonResponse({"error": "limit must be greater than 0"}, status=400)
 
     try:
         # Convert geocode to Point
         lat_str, lng_str = geocode.split(",")
         property_location = Point(float(lng_str), float(lat_str), srid=4326)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+    try:
+        prop = Property.objects.get(id=property_id)
+    except Property.DoesNotExist:
+        return JsonResponse({"error": "Property not found"}, status=404)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+    content, status, text = groceries_response(property_location, prop, walking_time, limit)
+    return layer_response(content, status, text)
+
+
+def _nearest_features(response: dict, limit: int = None) -> dict:
+    """Keep the `limit` nearest stores of a response (its features are sorted by distance)."""
+    if limit is None:
+        return response
+    geojson = response["grocery_geojson"]
+    return response | {"grocery_geojson": geojson | {"features": geojson["features"][:limit]}}
 
-        # Convert walking time to distance
-        walking_distance = walking_time * WALKING_METERS_PER_MIN
 
-        # Query nearby groceries
-        groceries = (
-            Amenity.objects.filter(type=AmenityType.GROCERY)
-            .annotate(distance=Distance("location", property_location))
-            .filter(distance__lte=walking_distance)
-            .order_by("distance")
+def groceries_data(
+    property_location: Point, prop: Property, walking_time: int = 15, limit: int = None
+):
+    """
+    `groceries_response` for the property bundle, which needs the content as a dict.
+
+    Returns (tuple[dict, int]): response content and HTTP status.
+    """
+    content, status, text = groceries_response(property_location, prop, walking_time, limit)
+    if content is None:
+        content = json.loads(text)
+    return content, status
+
+
+def groceries_response(
+    property_location: Point, prop: Property, walking_time: int = 15, limit: int = None
+):
+    """
+    Core of `_fetch_groceries`: find the grocery stores within the walking distance,
+    nearest first. Responses are cached on the property per walking time and grocery
+    dataset version, and served from there on a hit.
+
+    Args:
+        limit (int): only return the `limit` nearest stores. Limited responses are cut
+            from the cached full response if there is one, and are not cached themselves.
+
+    Returns (tuple[dict | None, int, str | None]): response content, HTTP status and,
+        when the response was just built, its JSON text with the GeoJSON of the database
+        spliced in, so that it is sent without encoding the stores again. The content is
+        only decoded for the cache on the property, so it is None for limited responses.
+    """
+    version = DatasetVersion.current(DatasetName.GROCERIES)
+    cached = prop.get_cached_response("groceries", version, walking_time)
+    if cached is not None:
+        return _nearest_features(cached, limit), 200, None
+
+    try:
+        # Query nearby groceries, nearest first
+        geojson, _ = amenities_geojson(
+            property_location, [AmenityType.GROCERY], walking_time, limit
         )
+        header = {"address": prop.address, "walking_time": walking_time}
 
-        # Build GeoJSON features
-        features = []
-        for g in groceries:
-            features.append(
-                {
-                    "type": "Feature",
-                    "geometry": {
-                        "type": "Point",
-                        "coordinates": [g.location.x, g.location.y],
-                    },
-                    "properties": {
-                        "name": g.name,
-                        "distance_min": round(g.distance.m / WALKING_METERS_PER_MIN, 1),
-                        "address": getattr(g, "address", ""),
-                    },
-                }
-            )
-
-        geojson = {
-            "type": "FeatureCollection",
-            "features": features,
-        }
-
-        # Return JSON response
-        response = {
-            "address": "",
-            "walking_time": walking_time,
-            "grocery_geojson": geojson,
-        }
-
-        # cache to Property
-        try:
-            prop = Property.objects.get(id=property_id)
-            response["address"] = prop.address
-            if not prop.groceries:
-                prop.groceries = response
-                prop.save()
-        except Property.DoesNotExist:
-            return JsonResponse({"error": "Property not found"}, status=404)
-        except Exception as e:
-            return JsonResponse({"error": f"Failed to update Property: {str(e)}"}, status=400)
-
-        return JsonResponse(response)
+        # cache to Property (full responses only)
+        response = None
+        if limit is None:
+            try:
+                response = header | {"grocery_geojson": json.loads(geojson)}
+                prop.set_cached_response("groceries", version, walking_time, response)
+            except Exception as e:
+                return {"error": f"Failed to update Property: {str(e)}"}, 400, None
+
+        return response, 200, json_text(header, grocery_geojson=geojson)
 
     except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+        return {"error": str(e)}, 500, None
@@ -1,55 +1,185 @@
-from apt_app.models import Violation, InspectionSummary
+from apt_app.addresses import canonicalize_address, is_street_name_variant
+from apt_app.models import (
+    INSPECTION_CATEGORIES,
+    Address,
+    InspectionSummary,
+    Violation,
+    ViolationStats,
+)
 import datetime
+from django.db.models import Count, OuterRef, Q, Subquery
 from django.http import JsonResponse, HttpRequest
 import logging
-from scripts import inspections_utils as iu
+from config import load_constants
 
 # Get a logger for this module
 logger = logging.getLogger(__name__)
 
+CONSTANTS = load_constants()
+INSPECTIONS_ADDRESS_MIN_SIMILARITY = CONSTANTS["INSPECTIONS_ADDRESS_MIN_SIMILARITY"]
+# Most similar violation addresses checked for a street name variant of the input
+SIMILAR_ADDRESS_CANDIDATES = 10
+# Start dates precomputed in ViolationStats, other start dates are counted on the fly
+VIOLATION_STATS_START_DATES = [
+    datetime.date.fromisoformat(d) for d in CONSTANTS["VIOLATION_STATS_START_DATES"]
+]
+
+STATS_FIELDS = (
+    "total_violations_count",
+    "total_inspections_count",
+    "trivial_violations_count",
+    "trivial_inspections_count",
+    "summary",
+)
+# Stats of an address without violations
+NO_VIOLATION_STATS = dict.fromkeys(STATS_FIELDS, 0) | {"summary": None}
+
 
 def parse_address(in_address: str) -> str:
-    """fetch the first part of address in uppercase, before "Chicago IL 60XXX"""
+    """fetch the canonical street line of the address, before "Chicago IL 60XXX" """
     try:
-        return in_address.upper().split(",")[0].strip()
+        return canonicalize_address(in_address)
     except Exception as e:
         logger.error(f"Error parsing address: {e}")
         return ""
 
 
+def refresh_violation_stats() -> int:
+    """Rebuild ViolationStats after violations are ingested. Returns the number of rows."""
+    return ViolationStats.refresh(VIOLATION_STATS_START_DATES)
+
+
+def _summary_of(address_ref: str) -> Subquery:
+    """Inspection summary of the Address referenced by the outer query"""
+    # TODO: need to appply time-based sorting
+    return Subquery(
+        InspectionSummary.objects.filter(address_obj=OuterRef(address_ref)).values("summary")[:1]
+    )
+
+
+def violation_stats(parsed_address: str, start_date) -> dict:
+    """
+    Violation counts and inspection summary of an address, in a single query: a lookup of
+    the precomputed ViolationStats row for the usual start dates, otherwise the counts
+    of `count_violation_stats`.
+
+    Args:
+        parsed_address (str): canonical address, see `parse_address`.
+        start_date (datetime.date): only violations after this date are counted.
+
+    Returns (dict): total_violations_count, total_inspections_count (distinct dates),
+        trivial_violations_count, trivial_inspections_count and summary (None if the
+        address has no inspection summary).
+    """
+    if start_date not in VIOLATION_STATS_START_DATES:
+        return count_violation_stats(parsed_address, start_date)
+    stats = (
+        ViolationStats.objects.filter(address__canonical=parsed_address, start_date=start_date)
+        .annotate(summary=_summary_of("address_id"))
+        .values(*STATS_FIELDS)
+        .first()
+    )
+    # No row: no violation after the start date
+    return stats or dict(NO_VIOLATION_STATS)
+
+
+def count_violation_stats(parsed_address: str, start_date) -> dict:
+    """
+    `violation_stats` counted from the raw violations: one row of Address with
+    conditional (FILTER) counts over its violations and the summary as a subquery.
+    """
+    recent = Q(
+        violations__violation_date__gt=start_date,
+        violations__inspection_category__in=INSPECTION_CATEGORIES,
+    )
+    trivial = recent & Q(violations__is_trivial=True)
+    stats = (
+        Address.objects.filter(canonical=parsed_address)
+        .annotate(
+            total_violations_count=Count("violations", filter=recent),
+            total_inspections_count=Count(
+                "violations__violation_date", distinct=True, filter=recent
+            ),
+            trivial_violations_count=Count("violations", filter=trivial),
+            trivial_inspections_count=Count(
+                "violations__violation_date", distinct=True, filter=trivial
+            ),
+            summary=_summary_of("pk"),
+        )
+        .values(*STATS_FIELDS)
+        .first()
+    )
+    # Address never seen: no violation and no summary
+    return stats or dict(NO_VIOLATION_STATS)
+
+
+def similar_violation_address(parsed_address: str):
+    """
+    Canonical address of the violations whose address is the most similar to
+    `parsed_address` (trigram similarity), for a misspelled street name. Only addresses
+    with the same house number, directional, street type and street number are kept
+    (see `is_street_name_variant`): "1234 W 55TH ST" or "1155 E 61ST ST" are other
+    buildings, whose violations must not be shown for "1234 E 55TH ST" or "1155 E 60TH ST".
+
+    Returns (str | None): canonical address, None if no address is similar enough.
+    """
+    candidates = (
+        Violation.objects.similar_address(parsed_address, INSPECTIONS_ADDRESS_MIN_SIMILARITY)
+        .exclude(canonical_address=parsed_address)
+        .values_list("canonical_address", flat=True)
+        .distinct()[:SIMILAR_ADDRESS_CANDIDATES]
+    )
+    return next(
+        (address for address in candidates if is_street_name_variant(parsed_address, address)),
+        None,
+    )
+
+
 def _fetch_inspection_summaries(address, start_date=datetime.date(2020, 1, 1)) -> JsonResponse:
     """
     Fetch inspection summaries for a given address and cut-off date.
+    See `inspection_summaries_data` for the arguments.
+    """
+    content, status = inspection_summaries_data(address, start_date)
+    return JsonResponse(content, status=status)
+
+
+def inspection_summaries_data(address, start_date=datetime.date(2020, 1, 1)):
+    """
+    Core of `_fetch_inspection_summaries`, shared with the property bundle.
 
     Args:
         address (str): The address to fetch inspection summaries for.
         start_date (datetime.date): The cut-off date to count the number of inspections and \
             violations. Currently hardcoded to the default of 2020-01-01 for recency.
 
+    Returns (tuple[dict, int]): response content and HTTP status.
+
     ref:
     - https://docs.djangoproject.com/en/5.1/ref/models/class/#doesnotexist
     """
     try:
         if not address:
-            return JsonResponse({"error": "Address is required"}, status=400)
+            return {"error": "Address is required"}, 400
 
         parsed_address = parse_address(address)
         if not parsed_address:
-            return JsonResponse({"error": "Invalid address format"}, status=400)
+            return {"error": "Invalid address format"}, 400
 
         logger.info(f"Fetching violations for address: {parsed_address}")
 
         content = {"address": parsed_address, "start_date": start_date}
 
-        violations = (
-            Violation.objects.filter(address__istartswith=parsed_address)
-            .filter(violation_date__gt=start_date)
-            # TODO: might want to parameterize this in the future
-            .filter(inspection_category__in=["COMPLAINT", "PERIODIC"])
-        )
-
-        total_violations_count = violations.count()
-        total_occasions_count = violations.distinct("violation_date").count()
+        stats = violation_stats(parsed_address, start_date)
+        if stats["total_violations_count"] == 0:
+            # fall back to the most similar address with violations, if any
+            matched_address = similar_violation_address(parsed_address)
+            if matched_address:
+                logger.info(f"No violations for {parsed_address}, using {matched_address}")
+                stats = violation_stats(matched_address, start_date)
+                content["matched_address"] = matched_address
+        total_violations_count = stats["total_violations_count"]
+        total_occasions_count = stats["total_inspections_count"]
         logger.info(
             f"Total violations: {total_violations_count}, \
             Total inspections: {total_occasions_count}"
@@ -59,38 +189,33 @@ def _fetch_inspection_summaries(address, start_date=datetime.date(2020, 1, 1)) -
         if total_violations_count == 0:
             content["data_status"] = "no_violations"
             content["summary"] = "No violation record found for this address"
-            return JsonResponse(content, status=200)
+            return content, 200
 
         content["total_violations_count"] = total_violations_count
         content["total_inspections_count"] = total_occasions_count
 
-        inspection_summary = InspectionSummary.objects.filter(
-            address__istartswith=parsed_address
-        ).first()  # TODO: need to appply time-based sorting
-
         # second case: violations found but considered trivial and thus not summarized
-        if not inspection_summary:
+        if stats["summary"] is None:
             content["data_status"] = "trivial_only"
             content["summary"] = (
                 f"{total_violations_count} trivial violations about inspector having no entry were \
                 reported on {total_occasions_count} occasions and omitted here for brevity."
             )
-            return JsonResponse(content, status=200)
+            return content, 200
 
         # third case: violations found and summarized
-        summary_json = inspection_summary.summary
+        summary_json = stats["summary"]
         logger.debug(f"Inspection summary JSON: {summary_json}")
-        trivial_violations = violations.filter(violation_code__in=iu.TRIVIAL_VIOLATION_CODES)
-        trivial_violations_count = trivial_violations.count()
-        trivial_occasions_count = trivial_violations.distinct("violation_date").count()
+        trivial_violations_count = stats["trivial_violations_count"]
+        trivial_occasions_count = stats["trivial_inspections_count"]
         content = content | summary_json
         content["note"] = (
             f"{trivial_violations_count} trivial violations about inspector having no entry were \
             reported on {trivial_occasions_count} occasions and omitted here for brevity."
         )
         content["data_status"] = "available"
-        return JsonResponse(content, status=200)
+        return content, 200
 
     except Exception as e:
         logger.error(f"An error occurred: {str(e)}")
-        return JsonResponse({"error": str(e)}, status=500)
+        return {"error": str(e)}, 500
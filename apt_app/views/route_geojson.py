@@ -0,0 +1,25 @@
+import re
+from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
+from apt_app.geojson import geojson_response
+from apt_app.route_blobs import blob_path
+
+# Blobs never change once written
+IMMUTABLE_MAX_AGE_SECONDS = 365 * 24 * 3600
+
+
+def _route_geojson_blob(digest: str):
+    """
+    GeoJSON document of a route by its SHA-256, cacheable forever.
+
+    Returns (HttpResponse): FeatureCollection with one route, `Cache-Control: immutable`.
+    """
+    if not re.fullmatch(r"[0-9a-f]{64}", digest):
+        return JsonResponse({"error": "Not found"}, status=404)
+    try:
+        text = blob_path(digest).read_text()
+    except FileNotFoundError:
+        return JsonResponse({"error": "Not found"}, status=404)
+    response = geojson_response(text)
+    patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE_SECONDS, immutable=True)
+    return response
@@ -1,6 +1,7 @@
 import re
 from django.shortcuts import render
 from django.http import HttpResponse
+from apt_app.addresses import canonicalize_address
 from apt_app.models import Property, SavedProperty
 
 
@@ -34,9 +35,9 @@ def _save_property(request):
     proper_address = re.sub(r"\b(Il)\b", "IL", proper_address)
 
     # Find the property in the Property table
-    # Whenever querying the database, defaulting to always user `upper()` just
-    # in case
-    matching_property = Property.objects.filter(address=property_address.upper()).first()
+    # Lookups are exact matches on the canonical address (see apt_app/addresses.py)
+    canonical_address = canonicalize_address(property_address)
+    matching_property = Property.objects.filter(address_obj__canonical=canonical_address).first()
 
     if not matching_property:
         print("Could not find property in the Property table")
@@ -44,7 +45,7 @@ def _save_property(request):
 
     # Check if the property is already present in saved_property
     property_in_savedproperty = SavedProperty.objects.filter(
-        user=request.user, address=property_address.upper()
+        user=request.user, address_obj_id=matching_property.address_obj_id
     ).first()
 
     # Handle existing or deleted properties
@@ -61,6 +62,7 @@ def _save_property(request):
             user=request.user,
             property_obj=matching_property,
             address=property_address.upper(),
+            address_obj_id=matching_property.address_obj_id,
         )
         saved_property.save()
 
@@ -0,0 +1,28 @@
+from django.http import HttpResponse, JsonResponse
+from apt_app.tiles import TILE_CONTENT_TYPE, TILE_LAYERS, get_tile, is_valid_tile
+
+
+def _tile(layer: str, z: int, x: int, y: int):
+    """
+    Vector tile (Mapbox Vector Tile) of a transit or amenity layer, see apt_app/tiles.py.
+    Tiles are read from the tile store, and rendered in PostGIS only on a miss.
+
+    Args:
+        layer (str): "routes", "stops" or "amenities".
+        z, x, y (int): tile coordinates.
+
+    Returns (HttpResponse): the tile, with an empty body if no feature is in the tile, and
+        an `X-Cache: HIT|MISS` header.
+    """
+    if layer not in TILE_LAYERS:
+        return JsonResponse({"error": f"Unknown layer: {layer}"}, status=404)
+    if not is_valid_tile(z, x, y):
+        return JsonResponse({"error": f"Invalid tile: {z}/{x}/{y}"}, status=400)
+
+    try:
+        tile, stored = get_tile(layer, z, x, y)
+    except Exception as e:
+        return JsonResponse({"error": f"Failure in rendering tile: {str(e)}"}, status=500)
+    response = HttpResponse(tile, content_type=TILE_CONTENT_TYPE)
+    response["X-Cache"] = "HIT" if stored else "MISS"
+    return response
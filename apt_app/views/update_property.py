@@ -1,6 +1,7 @@
 from django.shortcuts import render
 from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
+from apt_app.addresses import canonicalize_address
 from apt_app.models import SavedProperty
 
 
@@ -14,7 +15,6 @@ def _update_property(request):
     if request.method == "POST":
         # Get form data
         property_address = request.POST.get("property_address", "")
-        property_address_upper_case = property_address.upper()
         property_custom_name = request.POST.get("property_custom_name", "")
         property_notes = request.POST.get("property_notes", "")
         property_rent = request.POST.get("property_rent", "")
@@ -25,7 +25,7 @@ def _update_property(request):
 
         # Getting the saved property ID
         matching_saved_property = SavedProperty.objects.filter(
-            user=request.user, address=property_address_upper_case
+            user=request.user, address_obj__canonical=canonicalize_address(property_address)
         ).first()
 
         if matching_saved_property:
@@ -8,10 +8,13 @@ from apt_app.models import TransitStop, Property, SavedProperty
 from django.contrib.gis.db.models.functions import Distance as DistanceFunction
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET
+from apt_app.cache import cached_endpoint
+from apt_app.models import DatasetName
 
 # Importing core functionality modules
 from .fetch_all_data import _fetch_all_data
 from .fetch_groceries import _fetch_groceries
+from .fetch_amenities import _fetch_amenities
 from .fetch_bus_stops import _fetch_bus_stops
 from .fetch_inspections import _fetch_inspection_summaries
 from .save_property import _save_property
@@ -20,7 +23,11 @@ from .delete_property import _delete_property
 from .check_property_status import _check_property_status
 from .handle_post_login import _handle_post_login
 from .fetch_bus_routes import _fetch_bus_routes
+from .fetch_property_bundle import _fetch_property_bundle
 from .saved_properties import _saved_properties
+from .cache_stats import _cache_stats
+from .tiles import _tile
+from .route_geojson import _route_geojson_blob
 
 
 def home(request):
@@ -38,15 +45,40 @@ def fetch_all_data(request):
 
 
 @require_GET
+@cached_endpoint(
+    "fetch_groceries",
+    params=("geocode", "property_id", "walking_time", "limit"),
+    datasets=(DatasetName.GROCERIES,),
+)
 def fetch_groceries(request):
     # extract parameters from request
     geocode = request.GET.get("geocode")
     property_id = request.GET.get("property_id")
     walking_time = int(request.GET.get("walking_time", 5))
-    return _fetch_groceries(geocode, property_id, walking_time)
+    limit = request.GET.get("limit")  # optional, only the `limit` nearest stores
+    return _fetch_groceries(geocode, property_id, walking_time, int(limit) if limit else None)
 
 
 @require_GET
+@cached_endpoint(
+    "fetch_amenities",
+    params=("geocode", "property_id", "types", "walking_time"),
+    datasets=(DatasetName.GROCERIES, DatasetName.AMENITIES),
+)
+def fetch_amenities(request):
+    geocode = request.GET.get("geocode")
+    property_id = request.GET.get("property_id")
+    types = request.GET.get("types", "")  # comma-separated AmenityType values, all if empty
+    walking_time = int(request.GET.get("walking_time", 15))
+    return _fetch_amenities(geocode, property_id, types, walking_time)
+
+
+@require_GET
+@cached_endpoint(
+    "fetch_bus_stops",
+    params=("geocode", "property_id", "walking_time"),
+    datasets=(DatasetName.TRANSIT,),
+)
 def fetch_bus_stops(request):
     geocode = request.GET.get("geocode")
     walking_time = int(request.GET.get("walking_time", 5))  # default 5 min
@@ -55,15 +87,43 @@ def fetch_bus_stops(request):
 
 
 @require_GET
+@cached_endpoint("fetch_inspections", params=("address",), datasets=(DatasetName.INSPECTIONS,))
 def fetch_inspections(request):
     address = request.GET.get("address", "")
     return _fetch_inspection_summaries(address)
 
 
 @require_GET
+@cached_endpoint("fetch_bus_routes", params=("bus_route", "zoom"), datasets=(DatasetName.TRANSIT,))
 def fetch_bus_routes(request):
     route_id = request.GET.get("bus_route", "")
-    return _fetch_bus_routes(route_id)
+    zoom = request.GET.get("zoom", "")  # optional, simplify the geometries to this zoom
+    return _fetch_bus_routes(route_id, zoom)
+
+
+@require_GET
+def route_geojson_blob(request, digest):
+    return _route_geojson_blob(digest)
+
+
+@require_GET
+def fetch_property_bundle(request):
+    property_id = request.GET.get("property_id")
+    walking_time = int(request.GET.get("walking_time", 15))
+    stream = request.GET.get("stream", "") in ("1", "true")
+    return _fetch_property_bundle(property_id, walking_time, stream)
+
+
+@require_GET
+def tile(request, layer, z, x, y):
+    """Vector tile of the routes, stops or amenities layer for MapLibre"""
+    return _tile(layer, z, x, y)
+
+
+@require_GET
+def cache_stats(request):
+    """Hit/miss counters of the endpoint cache, staff only"""
+    return _cache_stats(request)
 
 
 def save_property(request):
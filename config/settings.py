@@ -80,6 +80,19 @@ CSRF_TRUSTED_ORIGINS = ["https://aptpl.us"] # for Login function
 # Debug Toolbar
 IS_TESTING = "test" in sys.argv or "pytest" in sys.argv
 
+# Cache used by the fetch_* endpoints (see apt_app/cache.py).
+# Defaults to a file-based cache shared by the workers of one host; set CACHE_URL
+# to a shared backend (e.g. redis://..., pymemcache://...) to share it across hosts.
+# ref: https://django-environ.readthedocs.io/en/latest/types.html#environ-env-cache-url
+_DEFAULT_CACHE_URL = "locmemcache://" if IS_TESTING else f"filecache://{BASE_DIR / '_cache'}"
+CACHES = {"default": env.cache("CACHE_URL", default=_DEFAULT_CACHE_URL)}
+
+# Vector tiles rendered by /tiles/ (see apt_app/tiles.py), pre-seeded by `seed_tiles`
+TILE_STORE_DIR = env.path("TILE_STORE_DIR", default=BASE_DIR / "_tiles")
+
+# GeoJSON documents of the bus routes written by the import (see apt_app/route_blobs.py)
+ROUTE_BLOB_DIR = env.path("ROUTE_BLOB_DIR", default=BASE_DIR / "_route_blobs")
+
 
 # Static Settings ------
 #
@@ -95,6 +108,7 @@ INSTALLED_APPS = [
     "whitenoise.runserver_nostatic",
     "django.contrib.staticfiles",
     "django.contrib.gis",  # Added for GeoDjango
+    "django.contrib.postgres",  # Registers the trigram_similar lookup
     "allauth",
     "anymail",  # Application for sending emails using Brevo
     "allauth.account",
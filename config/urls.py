@@ -23,14 +23,19 @@ from apt_app.views.views import (
     fetch_all_data,
     fetch_bus_stops,
     fetch_groceries,
+    fetch_amenities,
     fetch_inspections,
     fetch_bus_routes,
+    route_geojson_blob,
+    fetch_property_bundle,
     save_property,
     update_property,
     handle_post_login,
     check_property_status,
     delete_property,
     saved_properties,
+    cache_stats,
+    tile,
 )
 from django.conf import settings
 from debug_toolbar.toolbar import debug_toolbar_urls
@@ -44,12 +49,17 @@ urlpatterns = [
     path("fetch_bus_stops/", fetch_bus_stops, name="fetch_bus_stops"),
     path("fetch_all_data/", fetch_all_data, name="fetch_all_data"),
     path("fetch_groceries/", fetch_groceries, name="fetch_groceries"),
+    path("fetch_amenities/", fetch_amenities, name="fetch_amenities"),
     path(
         "fetch_inspections/",
         fetch_inspections,
         name="fetch_inspection_summaries",
     ),
     path("fetch_bus_routes/", fetch_bus_routes, name="fetch_bus_routes"),
+    path("bus_routes/blobs/<str:digest>.geojson", route_geojson_blob, name="bus_route_blob"),
+    path("fetch_property_bundle/", fetch_property_bundle, name="fetch_property_bundle"),
+    path("cache_stats/", cache_stats, name="cache_stats"),
+    path("tiles/<str:layer>/<int:z>/<int:x>/<int:y>.pbf", tile, name="tile"),
     path("save_property/", save_property, name="save_property"),
     path("update_property/", update_property, name="update_property"),
     path("handle_post_login/", handle_post_login, name="handle_post_login"),
@@ -2,7 +2,8 @@ import os
 import sys
 from dotenv import load_dotenv
 import django
-from apt_app.models import Amenity, AmenityType
+from apt_app.models import Amenity, AmenityType, DatasetName, DatasetVersion
+from apt_app.tiles import invalidate_tiles
 import pandas as pd
 from sqlalchemy import create_engine
 from tqdm import tqdm
@@ -82,3 +83,8 @@ if __name__ == "__main__":
             continue
 
         run_bulk_import(df, amenity_type)
+
+    # Invalidate the grocery and amenity caches computed from the previous data
+    DatasetVersion.bump(DatasetName.GROCERIES)
+    DatasetVersion.bump(DatasetName.AMENITIES)
+    invalidate_tiles([DatasetName.GROCERIES, DatasetName.AMENITIES])
@@ -9,7 +9,6 @@ from django.contrib.gis.geos import Point
 from django.contrib.gis.measure import Distance as DistanceRatio
 from django.contrib.gis.db.models.functions import Distance as DistanceFunction
 import logging
-from django.db.models import Prefetch
 from django.core.serializers import serialize
 
 
@@ -97,18 +96,6 @@ def stops_near_a_point(latitude_input, longitude_input, walking_time_input):
     near_stops = near_stops.annotate(distance=DistanceFunction("location", reference_point))
     print(f"Number of nearby stops: {near_stops.count()}")
 
-    # Get the relationship considerably faster between bus stop and route id with
-    # prefetch_related and only
-    ## NOTE: I checked the use of prefecth_related and only on Django documentation,
-    ## particularly, links 1 and 2.
-    ## Link 1: https://docs.djangoproject.com/en/5.2/ref/models/querysets/#prefetch-related
-    ## Link 2: https://docs.djangoproject.com/en/5.2/ref/models/querysets/#only
-    near_stops = near_stops.prefetch_related(
-        Prefetch(
-            "routes",
-            queryset=TransitRoute.objects.only("route_id"),
-        )
-    )
     # Log results
     for stop in near_stops:
         # get bus stop
@@ -116,9 +103,8 @@ def stops_near_a_point(latitude_input, longitude_input, walking_time_input):
             f"ID: {stop.id}, Name: {stop.name}, Type: {stop.type}, "
             + f"Location: {stop.location}, Distance (meters): {stop.distance.m:.1f}"
         )
-        # get the routes related to that stop
-        route_ids = [route.route_id for route in stop.routes.all()]
-        logger.info(f"The routes of this stop are {route_ids}")
+        # get the routes related to that stop (denormalized on the stop, no join)
+        logger.info(f"The routes of this stop are {stop.route_ids}")
 
     # Total time of function
     end_time = time.perf_counter()
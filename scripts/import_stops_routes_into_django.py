@@ -21,6 +21,9 @@ django.setup()
 # Import model (after setup of django)
 from apt_app.models import TransitStop  # noqa: E402
 from apt_app.models import TransitRoute  # noqa: E402
+from apt_app.models import DatasetName, DatasetVersion  # noqa: E402
+from apt_app.tiles import invalidate_tiles  # noqa: E402
+from apt_app.route_blobs import write_route_blobs  # noqa: E402
 
 
 def create_stop_from_row(row):
@@ -200,3 +203,13 @@ if __name__ == "__main__":
 
     # Import relationships into Django model
     run_bulk_import(df_stops, create_route_stop_relationship_from_row, stop_dict, route_dict)
+
+    # Denormalize the relationships into TransitStop.route_ids
+    TransitStop.refresh_route_ids()
+
+    # Immutable GeoJSON documents of the routes, see apt_app/route_blobs.py
+    write_route_blobs()
+
+    # Invalidate the bus stop caches computed from the previous data
+    DatasetVersion.bump(DatasetName.TRANSIT)
+    invalidate_tiles([DatasetName.TRANSIT])
@@ -9,7 +9,8 @@ import os
 import json
 from datetime import datetime
 from django.contrib.gis.geos import Point
-from apt_app.models import Violation
+from apt_app.addresses import canonicalize_address
+from apt_app.models import INSPECTION_CATEGORIES, Violation
 
 load_dotenv()
 
@@ -183,7 +184,7 @@ def generate_summary_of_trivial_violations(df: pd.DataFrame, trivial_codes: list
 
 
 def filter_df_by_address(address: str, df: pd.DataFrame) -> pd.DataFrame:
-    return df[df["ADDRESS"].str.upper().str.startswith(address.upper())]
+    return df[df["ADDRESS"].map(canonicalize_address) == canonicalize_address(address)]
 
 
 _TRAILING_CODES = re.compile(
@@ -348,14 +349,20 @@ def llm_summarize_for_one_address(
         return {}
 
 
-def generate_summary_for_one_address(address, df, model):
+def generate_summary_for_one_address(address, df, model, is_candidate: bool = False):
+    """
+    Summarize the violations of one address, None if it has only trivial violations.
+    `is_candidate`: the address comes from `select_addresses_to_summarize`, so it is
+    known to have non-trivial violations and the check over `df` is skipped.
+    """
     print(f"ADDRESS: {address}")
     # first check if the address has any non-trivial violations
     # by checking if the df is empty if trivial violations are removed
-    df_filtered = filter_df_by_address(address, df).pipe(remove_trivial_violations_by_code)
-    if df_filtered.empty:
-        print("No non-trivial violations, skipping...\n----------------------------")
-        return None
+    if not is_candidate:
+        df_filtered = filter_df_by_address(address, df).pipe(remove_trivial_violations_by_code)
+        if df_filtered.empty:
+            print("No non-trivial violations, skipping...\n----------------------------")
+            return None
     # if df_filtered is not empty, summarize
     summary_json = llm_summarize_for_one_address(address=address, df=df, model=model)
     print(f"SUMMARY: {summary_json}")
@@ -363,6 +370,28 @@ def generate_summary_for_one_address(address, df, model):
     return summary_json
 
 
+def select_addresses_to_summarize(start_date: str = "2020-01-01") -> list[str]:
+    """
+    Canonical addresses with at least one non-trivial violation since `start_date` in the
+    inspection categories of /fetch_inspections/, i.e. the addresses that get a summary.
+    Database counterpart of `remove_trivial_violations_by_code` over the ingested
+    violations, answered by the partial index `violation_nontrivial_idx`. The batch
+    summarization (notebooks/inspections.ipynb) iterates over these addresses and calls
+    `generate_summary_for_one_address(..., is_candidate=True)`.
+    """
+    return list(
+        Violation.objects.filter(
+            is_trivial=False,
+            inspection_category__in=INSPECTION_CATEGORIES,
+            violation_date__gt=start_date,
+            address_obj__isnull=False,
+        )
+        .order_by("address_obj__canonical")
+        .values_list("address_obj__canonical", flat=True)
+        .distinct()
+    )
+
+
 # ----- DATA INGESTION -----
 
 
@@ -394,6 +423,8 @@ def create_one_violation_object(row) -> Violation:
         violation_last_modified_date=convert_date(row["VIOLATION LAST MODIFIED DATE"]),
         violation_date=convert_date(row["VIOLATION DATE"]),
         violation_code=row["VIOLATION CODE"],
+        # classified once here, so queries filter on an indexed flag instead of the codes
+        is_trivial=row["VIOLATION CODE"] in TRIVIAL_VIOLATION_CODES,
         violation_status=row["VIOLATION STATUS"],
         violation_status_date=convert_date(row["VIOLATION STATUS DATE"]),
         violation_description=row["VIOLATION DESCRIPTION"],
@@ -407,6 +438,8 @@ def create_one_violation_object(row) -> Violation:
         inspection_category=row["INSPECTION CATEGORY"],
         department_bureau=row["DEPARTMENT BUREAU"],
         address=row["ADDRESS"],
+        # bulk_create() does not call save(), so the canonical address is set here
+        canonical_address=canonicalize_address(row["ADDRESS"]),
         street_number=row["STREET NUMBER"],
         street_direction=row["STREET DIRECTION"],
         street_name=row["STREET NAME"],
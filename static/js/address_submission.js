@@ -24,10 +24,11 @@ export async function getApartment() {
   // First clean up mapState as we've just started modifying the address state
   mapState.busStopData = null;
   mapState.groceryData = null;
+  mapState.busRoutesData = null;
 
   // Show loading spinner while waiting for response
   toggleLoadingWheel();
-  let response, inspectionsPromise, groceriesPromise, busStopsPromise, routesPromise;
+  let response, bundlePromise;
 
   try {
     response = await sendRequest('/fetch_all_data/', address); 
@@ -51,12 +52,9 @@ export async function getApartment() {
   
     // Parse data and place on map, assuming appropriate format from endpoint
     const data = await response.json();
-    const coord = data.address_geojson.features[0].geometry.coordinates;
-    groceriesPromise = sendRequest('/fetch_groceries/', [coord, data['property_id']]); // start fetch_* requests ASAP
-    busStopsPromise = sendRequest('/fetch_bus_stops/', [coord, data['property_id']]); 
-    inspectionsPromise = sendRequest('/fetch_inspections/', data["cleaned_address"]);
-    // let routesPromise = make_requests(data); // placeholder for routes endpoint
-    
+    // One request for bus stops, groceries, inspections and routes, start it ASAP
+    bundlePromise = sendRequest('/fetch_property_bundle/', data['property_id']);
+
     placeAddress(data);
     switchSearchViewLoading(); // Clean up the front page and update left panel
     updateSearchView(data); // Pull in data from the response to update the overlay
@@ -67,42 +65,71 @@ export async function getApartment() {
     toggleLoadingWheel();
   }
 
-   // Handle remaining calls
-   try {
-    const inspections = await inspectionsPromise; 
-    updateViolations(inspections);
-    const groceries = await groceriesPromise;
-    const busStops = await busStopsPromise;
-    mapState.groceryData = await groceries.json(); // Per 5/24 discussion add Globally-scoped Grocery data, to refactor
-    mapState.busStopData = await busStops.json();  // Per 5/24 discussion add Globally-scoped Bus data, to refactor 
-
-    // Send routes API call  
-    const routes = await parse_busroutes(mapState.busStopData);
-    routesPromise = sendRequest('/fetch_bus_routes/', routes.join(','));
-
-    // update buttons
-    document.querySelectorAll('#filter-buttons .button.is-loading').forEach(button => {
-      if (button.id !== "busRoutesButton") {
-        button.classList.remove('is-loading');
-      }
-    });
+  // Handle the bundle sections as the server streams them
+  try {
+    const bundle = await bundlePromise;
+    await readBundleSections(bundle, handleBundleSection);
   } catch (err) {
     console.error('Details request could not be resolved by server:', err.message);
     showSearchError('An error occured while retrieving apartment details. Please try again.');
   }
+}
 
-  // Save route data
-  try {
-    const busRoutes = await routesPromise;
-    mapState.busRoutesData = await busRoutes.json();
-    document.querySelectorAll('#filter-buttons .button.is-loading').forEach(button => {
-      if (button.id === "busRoutesButton") {
-        button.classList.remove('is-loading');
+async function readBundleSections(response, onSection) {
+  /**
+   * Reads the NDJSON stream of `/fetch_property_bundle/?stream=1`, one section per line.
+   * @param {Response} response - response of the bundle request
+   * @param {function} onSection - called with each parsed section as soon as it arrives
+   * @returns {Promise<void>} resolves once the stream is fully read
+  */
+  // ref: https://developer.mozilla.org/en-US/docs/Web/API/Streams_API/Using_readable_streams
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    if (value) {
+      buffer += decoder.decode(value, { stream: true });
+    }
+    let newline;
+    while ((newline = buffer.indexOf('\n')) >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (line) {
+        onSection(JSON.parse(line));
       }
-    });
-  } catch (err) {
-    console.error('Details request could not be resolved by server:', err.message);
-    showSearchError('An error occured while retrieving bus route details. Please try again.');
+    }
+    if (done) {
+      return;
+    }
+  }
+}
+
+function handleBundleSection(section) {
+  /**
+   * Stores one section of the property bundle and updates the panel it belongs to.
+   * @param {Object} section - {section, status, data} line from the bundle stream
+   * @returns {void} - modifies mapState and the DOM directly
+  */
+  const buttonIds = {
+    groceries: 'groceriesButton',
+    bus_stops: 'busStopsButton',
+    bus_routes: 'busRoutesButton',
+  };
+  if (section.section === 'inspections') {
+    updateViolations(section.data);
+  } else if (section.section === 'groceries') {
+    mapState.groceryData = section.data; // Per 5/24 discussion add Globally-scoped Grocery data, to refactor
+  } else if (section.section === 'bus_stops') {
+    mapState.busStopData = section.data; // Per 5/24 discussion add Globally-scoped Bus data, to refactor
+  } else if (section.section === 'bus_routes') {
+    // Ids and colors of the routes, drawn from the route vector tiles
+    mapState.busRoutesData = section.data;
+  }
+
+  const button = document.getElementById(buttonIds[section.section]);
+  if (button) {
+    button.classList.remove('is-loading');
   }
 }
 
@@ -120,6 +147,10 @@ async function sendRequest(endpoint, body) {
     url.searchParams.append('address', body);
   } else if (endpoint==='/fetch_bus_routes/') {
     url.searchParams.append('bus_route', body);
+  } else if (endpoint==='/fetch_property_bundle/') {
+    url.searchParams.append('property_id', body);
+    url.searchParams.append('walking_time', 15);
+    url.searchParams.append('stream', 1);
   } else {
       url.searchParams.append('geocode', body[0]);
       url.searchParams.append('property_id', body[1]); 
@@ -312,12 +343,11 @@ async function checkPropertyStatus(propertyAddress) {
   }
 }
 
-async function updateViolations(response) {
+function updateViolations(data) {
   /** Function to update the violations panel of the frontend
-   * @param {Promise<object>} response - response object from `/fetch_violations/`
+   * @param {Object} data - inspections section of `/fetch_property_bundle/`
    * @returns {void} - modifies violations data directly.
   */
-  const data = await response.json();
 
   // Update violations panel to display information
   const violationsSummary = document.getElementById('violations-summary');
@@ -331,6 +361,9 @@ async function updateViolations(response) {
   
   // Add in data to display response issues by format
   violationsSummary.innerText = data['summary'];
+  if (data['matched_address']) { // Records of a misspelled street name, say which address
+    violationsSummary.innerText = `Showing records for ${data['matched_address']}. ` + data['summary'];
+  }
   if (data['data_status'] == "available") { // Only add issues list if they exist
     let i = 0;
     for (const elemTime of data.summarized_issues) {
@@ -191,32 +191,44 @@ export function toggleBusStops() {
 // Bus routes
 mapState.routes = {};
 
-export function displayBusRoute(map, geojsonFeature) {
+// Vector tiles of all the routes (`/tiles/routes/{z}/{x}/{y}.pbf`), shared by the route layers
+const ROUTE_TILES_SOURCE = "bus-route-tiles";
+
+function addRouteTilesSource(map) {
   /**
-   * Function to display a bus route on the map
+   * Adds the vector tile source of the bus routes to the map, once
    * @param {maplibregl.Map} map - MapLibre map object
-   * @param {object} geojsonFeature - GeoJSON MultiLineString Feature
    */
-  const routeId = geojsonFeature.properties.route_id;
+  if (map.getSource(ROUTE_TILES_SOURCE)) return;
+  map.addSource(ROUTE_TILES_SOURCE, {
+      type: "vector",
+      tiles: [`${window.location.origin}/tiles/routes/{z}/{x}/{y}.pbf`],
+      // Tiles above this zoom are drawn from the zoom 16 tiles
+      maxzoom: 16
+  });
+}
+
+export function displayBusRoute(map, route) {
+  /**
+   * Function to display a bus route on the map, from the vector tiles of the routes so
+   * that only the visible part of the route is loaded, at the resolution of the zoom
+   * @param {maplibregl.Map} map - MapLibre map object
+   * @param {object} route - {route_id, color} from the `bus_routes` section of the bundle
+   */
+  const routeId = route.route_id;
   if (!routeId || mapState.routes[routeId]) return;
 
-  const sourceId = `bus-route-source-${routeId}`;
   const layerId = `bus-route-layer-${routeId}`;
-
-  map.addSource(sourceId, {
-      type: "geojson",
-      data: {
-          type: "FeatureCollection",
-          features: [geojsonFeature]
-      }
-  });
+  addRouteTilesSource(map);
 
   map.addLayer({
       id: layerId,
       type: "line",
-      source: sourceId,
+      source: ROUTE_TILES_SOURCE,
+      "source-layer": "routes",
+      filter: ["==", ["get", "route_id"], routeId],
       paint: {
-          "line-color": geojsonFeature.properties.color,
+          "line-color": route.color,
           "line-width": 4
       }
   });
@@ -230,11 +242,11 @@ export function displayBusRoute(map, geojsonFeature) {
       .addTo(map);
   });
 
-  mapState.routes[routeId] = {sourceId, layerId};
+  mapState.routes[routeId] = {layerId};
 }
 
 export function removeBusRoute(map, routeId) {
-  /** Function to remove a bus route from the map
+  /** Function to remove a bus route from the map (the tile source is kept for the others)
    * @param {maplibregl.Map} map - MapLibre map object
    * @param {string} routeId - route identifier
    */
@@ -244,9 +256,6 @@ export function removeBusRoute(map, routeId) {
   if (map.getLayer(route.layerId)) {
       map.removeLayer(route.layerId);
   }
-  if (map.getSource(route.sourceId)) {
-      map.removeSource(route.sourceId);
-  }
 
   delete mapState.routes[routeId];
 }
@@ -262,14 +271,14 @@ export function clearBusRoutes(map) {
   mapState.routes = {};
 }
 
-export function toggleBusRoute(map, geojsonFeature) {
-  const routeId = geojsonFeature.route_id;
+export function toggleBusRoute(map, route) {
+  const routeId = route.route_id;
   if (!routeId) return;
 
   if (mapState.routes[routeId]) {
       removeBusRoute(map, routeId);
   } else {
-      displayBusRoute(map, geojsonFeature);
+      displayBusRoute(map, route);
   }
 }
 
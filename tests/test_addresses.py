@@ -0,0 +1,88 @@
+import pytest
+from apt_app.addresses import canonicalize_address, is_street_name_variant, street_line_parts
+from apt_app.models import Address, InspectionSummary
+
+
+@pytest.mark.parametrize(
+    "raw_address, expected",
+    [
+        ("5514 S Blackstone Ave", "5514 S BLACKSTONE AVE"),
+        (" 5514 s  blackstone ave ", "5514 S BLACKSTONE AVE"),
+        ("5514 S BLACKSTONE AVE, CHICAGO, IL, 60637", "5514 S BLACKSTONE AVE"),
+        ("5514 South Blackstone Avenue Chicago IL 60637", "5514 S BLACKSTONE AVE"),
+        ("5514 S. Blackstone Ave. #3", "5514 S BLACKSTONE AVE"),
+        ("5514 S Blackstone Ave Apt 2N, Chicago, IL", "5514 S BLACKSTONE AVE"),
+        ("5128-30 S Harper Avenue", "5128 S HARPER AVE"),
+        ("5128 - 5130 S Harper Ave", "5128 S HARPER AVE"),
+        ("1001 East 53rd Street", "1001 E 53RD ST"),
+        ("5000 S East End Ave", "5000 S EAST END AVE"),
+        ("1000 W Chicago Ave", "1000 W CHICAGO AVE"),
+        ("", ""),
+        (None, ""),
+    ],
+)
+def test_canonicalize_address(raw_address, expected):
+    assert canonicalize_address(raw_address) == expected
+
+
+def test_street_line_parts():
+    assert street_line_parts("5128 S HARPER AVE") == ("5128", "S", "HARPER", "AVE")
+    assert street_line_parts("5000 S EAST END AVE") == ("5000", "S", "EAST END", "AVE")
+    assert street_line_parts("1001 E 53RD ST") == ("1001", "E", "53RD", "ST")
+
+
+@pytest.mark.parametrize(
+    "street_line, other, expected",
+    [
+        ("5514 S BLACKSTON AVE", "5514 S BLACKSTONE AVE", True),
+        ("1234 E 55TH ST", "1234 W 55TH ST", False),
+        ("5128 S HARPER AVE", "5128 N HARPER AVE", False),
+        ("1155 E 60TH ST", "1155 E 61ST ST", False),
+        ("5514 S BLACKSTONE ST", "5514 S BLACKSTONE AVE", False),
+        ("5514 S BLACKSTONE AVE", "5516 S BLACKSTONE AVE", False),
+    ],
+)
+def test_is_street_name_variant(street_line, other, expected):
+    assert is_street_name_variant(street_line, other) == expected
+
+
+@pytest.mark.django_db
+def test_canonical_address_is_set_on_save():
+    summary = InspectionSummary.objects.create(
+        address="5128-30 South Harper Avenue, Chicago, IL 60615", summary={}
+    )
+    assert summary.canonical_address == "5128 S HARPER AVE"
+    assert InspectionSummary.objects.filter(canonical_address="5128 S HARPER AVE").exists()
+
+
+@pytest.mark.django_db
+def test_address_obj_is_shared_by_canonical_address():
+    first = InspectionSummary.objects.create(address="5128-30 S Harper Ave", summary={})
+    second = InspectionSummary.objects.create(address="5128 South Harper Avenue", summary={})
+    assert first.address_obj_id == second.address_obj_id
+    assert first.address_obj.canonical == "5128 S HARPER AVE"
+
+    # The bulk path links to the same Address and creates the missing ones
+    address_ids = Address.objects.ids_for(["5128 S HARPER AVE", "5130 S HARPER AVE", ""])
+    assert address_ids["5128 S HARPER AVE"] == first.address_obj_id
+    assert set(address_ids) == {"5128 S HARPER AVE", "5130 S HARPER AVE"}
+
+
+@pytest.mark.django_db
+def test_address_obj_follows_address_change_of_loaded_row():
+    summary = InspectionSummary.objects.create(address="5128 S Harper Ave", summary={})
+    first_address_id = summary.address_obj_id
+
+    # Read back without loading address_obj, then move the row to another address
+    summary = InspectionSummary.objects.get(pk=summary.pk)
+    summary.address = "5130 S Harper Ave"
+    summary.save()
+    summary = InspectionSummary.objects.select_related("address_obj").get(pk=summary.pk)
+    assert summary.address_obj_id != first_address_id
+    assert summary.address_obj.canonical == "5130 S HARPER AVE"
+
+    # An unchanged address keeps its link
+    summary = InspectionSummary.objects.get(pk=summary.pk)
+    summary.summary = {"note": "unchanged"}
+    summary.save()
+    assert summary.address_obj.canonical == "5130 S HARPER AVE"
@@ -0,0 +1,69 @@
+import pytest
+from django.contrib.gis.geos import Point
+from apt_app.models import Amenity, AmenityType, Property
+from apt_app.views.fetch_amenities import _parse_types
+
+# Test locations are in the middle of Lake Michigan, away from the real amenities
+
+
+def test_parse_types():
+    assert _parse_types("pharmacy, grocery") == ["grocery", "pharmacy"]
+    assert _parse_types(" GROCERY ,grocery") == ["grocery"]
+    assert _parse_types("") == list(AmenityType.values)
+    with pytest.raises(ValueError):
+        _parse_types("grocery,laundromat")
+
+
+@pytest.fixture
+def test_property(db):
+    return Property.objects.create(
+        address="Amenities Test St", location=Point(-87.0, 42.5, srid=4326)
+    )
+
+
+@pytest.fixture
+def test_amenities(db):
+    return [
+        Amenity.objects.create(
+            name=name,
+            type=amenity_type,
+            location=Point(-87.0, 42.5 + offset, srid=4326),
+            address=f"{name} Test St",
+        )
+        for name, amenity_type, offset in [
+            ("Near Grocery", AmenityType.GROCERY, 0.001),
+            ("Far Grocery", AmenityType.GROCERY, 0.005),
+            ("Pharmacy", AmenityType.PHARMACY, 0.002),
+            ("Cafe", AmenityType.CAFE, 0.001),
+            ("Remote Pharmacy", AmenityType.PHARMACY, 0.1),
+        ]
+    ]
+
+
+@pytest.mark.django_db
+def test_fetch_amenities_groups_types(client, test_property, test_amenities):
+    response = client.get(
+        "/fetch_amenities/",
+        {
+            "geocode": "42.5,-87.0",
+            "property_id": test_property.id,
+            "types": "pharmacy,grocery",
+            "walking_time": 15,
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["types"] == ["grocery", "pharmacy"]
+    assert data["counts"] == {"grocery": 2, "pharmacy": 1}
+    groceries = data["amenities_geojson"]["grocery"]["features"]
+    assert [f["properties"]["name"] for f in groceries] == ["Near Grocery", "Far Grocery"]
+    assert set(data["amenities_geojson"]) == {"grocery", "pharmacy"}
+
+
+@pytest.mark.django_db
+def test_fetch_amenities_unknown_type(client, test_property):
+    response = client.get(
+        "/fetch_amenities/",
+        {"geocode": "42.5,-87.0", "property_id": test_property.id, "types": "laundromat"},
+    )
+    assert response.status_code == 400
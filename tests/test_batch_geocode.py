@@ -0,0 +1,93 @@
+import csv
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from django.core.management import call_command
+from apt_app.models import GeocodeCache, Property
+from apt_app.management.commands.batch_geocode_properties import (
+    build_batch_csv,
+    parse_batch_response,
+)
+
+# Addresses known by the stand-in geocoder: input street -> (matched address, "lon,lat")
+STAND_IN_MATCHES = {
+    "5514 S BLACKSTONE AVE": ("5514 S BLACKSTONE AVE, CHICAGO, IL, 60637", "-87.5902,41.7954"),
+    "5496 S HYDE PARK BLVD": ("5496 S HYDE PARK BLVD, CHICAGO, IL, 60615", "-87.5838,41.7960"),
+}
+
+
+class StandInBatchGeocoder(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the Census batch geocoder: reads the uploaded CSV rows out of
+    the multipart body and answers in the Census batch response format.
+    """
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        out = io.StringIO()
+        writer = csv.writer(out, quoting=csv.QUOTE_ALL)
+        for row in csv.reader(io.StringIO(body)):
+            if len(row) != 5 or not row[0].isdigit():
+                continue
+            if row[1] in STAND_IN_MATCHES:
+                matched_address, coordinates = STAND_IN_MATCHES[row[1]]
+                writer.writerow(
+                    [row[0], row[1], "Match", "Exact", matched_address, coordinates, "1", "L"]
+                )
+            else:
+                writer.writerow([row[0], row[1], "No_Match"])
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.end_headers()
+        self.wfile.write(out.getvalue().encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_url():
+    server = HTTPServer(("127.0.0.1", 0), StandInBatchGeocoder)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/addressbatch"
+    server.shutdown()
+
+
+def test_build_and_parse_batch_csv():
+    assert build_batch_csv(["5514 S BLACKSTONE AVE"]) == "0,5514 S BLACKSTONE AVE,Chicago,IL,\r\n"
+    response = (
+        '"0","5514 S BLACKSTONE AVE, Chicago, IL, ","Match","Exact",'
+        '"5514 S BLACKSTONE AVE, CHICAGO, IL, 60637","-87.5902,41.7954","1","L"\n'
+        '"1","100 N NON EXISTENT ST, Chicago, IL, ","No_Match"\n'
+    )
+    assert parse_batch_response(response) == {
+        0: ("5514 S BLACKSTONE AVE, CHICAGO, IL, 60637", -87.5902, 41.7954)
+    }
+
+
+@pytest.mark.django_db
+def test_batch_geocode_creates_properties(stand_in_url, tmp_path):
+    """
+    Test that matched addresses get a Property and a geocode cache entry, and that
+    unmatched addresses are skipped.
+    """
+    addresses_file = tmp_path / "addresses.txt"
+    addresses_file.write_text(
+        "5514 S BLACKSTONE AVE\n5496 S HYDE PARK BLVD\n100 N NON EXISTENT ST\n"
+    )
+
+    call_command("batch_geocode_properties", "--file", str(addresses_file), "--url", stand_in_url)
+
+    for street, (matched_address, _) in STAND_IN_MATCHES.items():
+        assert Property.objects.filter(canonical_address=street).count() == 1, (
+            f"No Property created for {street}"
+        )
+        assert GeocodeCache.objects.get(query=street).matched_address == matched_address
+    assert not GeocodeCache.objects.filter(query="100 N NON EXISTENT ST").exists()
+
+    # Re-running does not create duplicates
+    call_command("batch_geocode_properties", "--file", str(addresses_file), "--url", stand_in_url)
+    for street in STAND_IN_MATCHES:
+        assert Property.objects.filter(canonical_address=street).count() == 1
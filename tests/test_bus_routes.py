@@ -1,6 +1,14 @@
 import pytest
 from pytest_django.asserts import assertTemplateNotUsed
-from apt_app.views.fetch_bus_routes import _fetch_bus_routes, _parse_input_routes
+from apt_app.models import TransitRoute
+from apt_app.route_blobs import blob_path, write_route_blobs
+from apt_app.views.fetch_bus_routes import (
+    _fetch_bus_routes,
+    _parse_input_routes,
+    bus_route_colors,
+    bus_routes_geojson,
+    route_geometry_column,
+)
 from django.http import JsonResponse
 import json
 
@@ -64,3 +72,82 @@ def test_endpoint_available(client):
     """
     response = client.get("/fetch_bus_routes/", {"bus_route": "5,171"})
     assert response.status_code == 200, f"Response status code: {response.status_code} is not 200"
+
+
+@pytest.mark.django_db
+def test_fetch_bus_routes_keeps_requested_order():
+    response = _fetch_bus_routes("171,5,171")
+    assert response.status_code == 200, f"Expected status code 200, got {response.status_code}"
+    assert response["Content-Type"] == "application/json"
+
+    features = json.loads(response.content)["features"]
+    route_ids = [f["properties"]["route_id"] for f in features]
+    assert route_ids == [r for r in ["171", "5"] if r in route_ids], "Not in the requested order"
+    colors = {f["properties"]["color"] for f in features}
+    assert len(colors) == len(route_ids), "Each route should have its own color"
+
+
+def test_route_geometry_column():
+    assert route_geometry_column(None) == "geometry"
+    assert route_geometry_column(18) == "geometry"
+    assert route_geometry_column(14) == "geometry_5m"
+    assert route_geometry_column(12) == "geometry_20m"
+    assert route_geometry_column(0) == "geometry_80m"
+    with pytest.raises(ValueError):
+        route_geometry_column(-1)
+
+
+def _count_points(features):
+    return sum(len(line) for f in features for line in f["geometry"]["coordinates"])
+
+
+@pytest.mark.django_db
+def test_fetch_bus_routes_simplified_to_zoom():
+    full = json.loads(_fetch_bus_routes("5,171,28").content)["features"]
+    simplified = json.loads(_fetch_bus_routes("5,171,28", "11").content)["features"]
+    assert [f["properties"] for f in simplified] == [f["properties"] for f in full]
+    assert 0 < _count_points(simplified) < _count_points(full)
+
+    assert _fetch_bus_routes("5,171,28", "-1").status_code == 400
+    assert _fetch_bus_routes("5,171,28", "far").status_code == 400
+
+
+@pytest.mark.django_db
+def test_route_geojson_blobs(client, settings, tmp_path):
+    settings.ROUTE_BLOB_DIR = tmp_path
+    assert write_route_blobs(["171"]) == 1
+    blobs = TransitRoute.objects.get(route_id="171").geojson_blobs
+    assert set(blobs) == {"geometry", "geometry_5m", "geometry_20m", "geometry_80m"}
+
+    # Content-addressed: writing the same route again keeps the same digests
+    write_route_blobs(["171"])
+    assert TransitRoute.objects.get(route_id="171").geojson_blobs == blobs
+
+    # One route is redirected to its blob, whose content is the direct response
+    response = _fetch_bus_routes("171", "14")
+    assert response.status_code == 302
+    assert response["Location"] == f"/bus_routes/blobs/{blobs['geometry_5m']}.geojson"
+    assert "no-cache" in response["Cache-Control"]
+
+    response = client.get(response["Location"])
+    assert response.status_code == 200
+    assert "immutable" in response["Cache-Control"]
+    assert response.content == blob_path(blobs["geometry_5m"]).read_bytes()
+    assert json.loads(response.content) == json.loads(bus_routes_geojson(["171"], 14))
+
+    # Several routes, or a route without blobs, are serialized as before
+    assert _fetch_bus_routes("171,5", "14").status_code == 200
+    TransitRoute.objects.filter(route_id="5").update(geojson_blobs={})
+    assert _fetch_bus_routes("5", "14").status_code == 200
+    assert client.get(f"/bus_routes/blobs/{'0' * 64}.geojson").status_code == 404
+
+
+@pytest.mark.django_db
+def test_bus_route_colors_match_geojson():
+    content = bus_route_colors(["171", "5", "500"])
+    geojson = json.loads(_fetch_bus_routes("171,5,500").content)["features"]
+    assert content["routes"] == [
+        {key: f["properties"][key] for key in ("route_id", "name", "type", "color")}
+        for f in geojson
+    ]
+    assert bus_route_colors(["500"]) is None
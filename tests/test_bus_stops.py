@@ -1,6 +1,8 @@
 import pytest
 from pytest_django.asserts import assertTemplateNotUsed
-from apt_app.views.fetch_bus_stops import _fetch_bus_stops
+from apt_app.models import TransitRoute, TransitStop
+from apt_app.views.fetch_bus_stops import _fetch_bus_stops, nearest_stop_per_route
+from django.contrib.gis.geos import LineString, MultiLineString, Point
 from django.http import JsonResponse
 import json
 
@@ -79,3 +81,46 @@ def test_endpoint_available(client):
         {"geocode": "41.795466862668, -87.590115956094", "property_id": "35", "walking_time": "5"},
     )
     assert response.status_code == 200, f"Response status code: {response.status_code} is not 200"
+
+
+@pytest.mark.django_db
+def test_fetch_bus_stops_sends_the_same_content_from_text_and_cache():
+    """The response built from the GeoJSON text on a miss matches the cached one on a hit"""
+    built = _fetch_bus_stops("41.795466862668, -87.590115956094 ", "35", 7)
+    cached = _fetch_bus_stops("41.795466862668, -87.590115956094 ", "35", 7)
+    assert built.status_code == cached.status_code == 200
+    assert json.loads(built.content) == json.loads(cached.content)
+
+
+@pytest.mark.django_db
+def test_nearest_stop_per_route():
+    """
+    A stop is kept only if it is the nearest stop of one of its routes, with all its routes
+    (test stops in the middle of Lake Michigan, away from the real ones)
+    """
+    line = MultiLineString(LineString((-87.0, 42.5), (-86.99, 42.51)), srid=4326)
+    r1, r2, r3 = (
+        TransitRoute.objects.create(route_id=f"TEST{i}", name=f"Test {i}", geometry=line)
+        for i in range(1, 4)
+    )
+    stops = {}
+    for name, offset, routes in [
+        ("A", 0.0001, [r1, r2]),
+        ("B", 0.0002, [r2]),
+        ("C", 0.0003, [r2, r3]),
+        ("D", 0.0004, [r1]),
+    ]:
+        stops[name] = TransitStop.objects.create(
+            name=name, location=Point(-87.0 + offset, 42.5, srid=4326)
+        )
+        stops[name].routes.set(routes)
+    TransitStop.refresh_route_ids()
+    assert TransitStop.objects.filter(route_ids__contains=["TEST2"]).count() == 3
+
+    stops_geojson, count = nearest_stop_per_route(Point(-87.0, 42.5, srid=4326), 500)
+    properties = [f["properties"] for f in json.loads(stops_geojson)["features"]]
+    assert count == 2
+    assert [(p["stop_id"], p["stop_name"], p["routes"]) for p in properties] == [
+        (str(stops["A"].id), "A", ["TEST1", "TEST2"]),
+        (str(stops["C"].id), "C", ["TEST2", "TEST3"]),
+    ]
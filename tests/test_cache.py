@@ -0,0 +1,97 @@
+import json
+import pytest
+from django.core.cache import cache
+from apt_app.cache import cache_stats, endpoint_cache_key
+from apt_app.models import DatasetName, DatasetVersion
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(settings):
+    """Run each test against its own empty in-memory cache"""
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test-endpoint-cache",
+        }
+    }
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_endpoint_cache_key_normalizes_params():
+    params = ("geocode", "property_id", "walking_time")
+    key = endpoint_cache_key(
+        "fetch_groceries",
+        {"geocode": "41.79, -87.59", "property_id": "35", "walking_time": "15"},
+        params,
+    )
+    assert key == endpoint_cache_key(
+        "fetch_groceries",
+        {"walking_time": " 015", "geocode": "41.790000,-87.590000", "property_id": "35", "_": "1"},
+        params,
+    )
+    assert key != endpoint_cache_key(
+        "fetch_groceries",
+        {"geocode": "41.79, -87.59", "property_id": "35", "walking_time": "5"},
+        params,
+    )
+    assert key != endpoint_cache_key(
+        "fetch_bus_stops",
+        {"geocode": "41.79, -87.59", "property_id": "35", "walking_time": "15"},
+        params,
+    )
+
+
+@pytest.mark.django_db
+def test_fetch_bus_routes_is_cached(client):
+    first = client.get("/fetch_bus_routes/", {"bus_route": "5,171,28"})
+    second = client.get("/fetch_bus_routes/", {"bus_route": " 5, 171 ,28 "})
+    assert first.status_code == second.status_code == 200
+    assert first["X-Cache"] == "MISS"
+    assert second["X-Cache"] == "HIT"
+    assert json.loads(first.content) == json.loads(second.content)
+
+    stats = cache_stats()["fetch_bus_routes"]
+    assert stats == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+@pytest.mark.django_db
+def test_cache_is_invalidated_by_dataset_version(client):
+    # Several routes, a single one can be redirected to its blob (not cached)
+    assert client.get("/fetch_bus_routes/", {"bus_route": "171,5"})["X-Cache"] == "MISS"
+    assert client.get("/fetch_bus_routes/", {"bus_route": "171,5"})["X-Cache"] == "HIT"
+
+    DatasetVersion.bump(DatasetName.TRANSIT)
+    assert client.get("/fetch_bus_routes/", {"bus_route": "171,5"})["X-Cache"] == "MISS"
+
+
+@pytest.mark.django_db
+def test_errors_are_not_cached(client):
+    first = client.get("/fetch_inspections/", {"address": ""})
+    second = client.get("/fetch_inspections/", {"address": ""})
+    assert first.status_code == second.status_code == 400
+    assert second["X-Cache"] == "MISS"
+
+
+@pytest.mark.django_db
+def test_cache_stats_is_staff_only(client, django_user_model):
+    assert client.get("/cache_stats/").status_code == 401
+
+    user = django_user_model.objects.create_user(
+        username="cache-stats@example.com", email="cache-stats@example.com", password="pw"
+    )
+    client.force_login(user)
+    assert client.get("/cache_stats/").status_code == 403
+
+    user.is_staff = True
+    user.save()
+    response = client.get("/cache_stats/")
+    assert response.status_code == 200
+    assert set(response.json()) == {
+        "fetch_bus_stops",
+        "fetch_groceries",
+        "fetch_amenities",
+        "fetch_inspections",
+        "fetch_bus_routes",
+    }
@@ -1,10 +1,18 @@
 import pytest
+import datetime
+from apt_app.models import GeocodeCache, AddressPoint, Property
+from apt_app.geocoder import CENSUS_GEOCODER
 from apt_app.views.fetch_all_data import (
     _fetch_all_data,
     match_address_in_chicago,
+    match_address_locally,
     coordinates_in_hyde_park,
+    save_property_in_django,
+    normalize_geocode_query,
+    GEOCODE_CACHE_TTL,
 )
 from django.http import JsonResponse
+from django.utils import timezone
 import json
 
 # address inside hyde park area
@@ -129,3 +137,93 @@ def test_endpoint_available(client):
     """
     response = client.get("/fetch_all_data/", {"address": "5496 S Hyde Park Blvd"})
     assert response.status_code == 200, f"Response status code: {response.status_code} is not 200"
+
+
+@pytest.mark.django_db
+def test_match_address_served_from_geocode_cache(monkeypatch):
+    """
+    Test that a cached geocode is returned without calling the Census geocoder.
+    """
+    GeocodeCache.objects.create(
+        query=normalize_geocode_query("5514 s blackstone ave"),
+        matched_address=FULL_MATCHED_ADDRESSES[1],
+        longitude=-87.5902,
+        latitude=41.7954,
+        in_chicago=True,
+    )
+
+    def fail_address(*args, **kwargs):
+        raise AssertionError("the Census geocoder should not be called on a cache hit")
+
+    monkeypatch.setattr(CENSUS_GEOCODER, "address", fail_address)
+    matched_address, _, _ = match_address_in_chicago("5514  S Blackstone Ave")
+    assert matched_address == FULL_MATCHED_ADDRESSES[1], "Cached address not returned"
+
+
+@pytest.mark.django_db
+def test_expired_geocode_cache_is_refreshed():
+    """
+    Test that an expired cache entry is refreshed from the Census geocoder.
+    """
+    query = normalize_geocode_query("5496 S Hyde Park Blvd")
+    GeocodeCache.objects.create(
+        query=query,
+        matched_address="STALE ADDRESS",
+        longitude=0.0,
+        latitude=0.0,
+        in_chicago=True,
+        cached_at=timezone.now() - GEOCODE_CACHE_TTL - datetime.timedelta(days=1),
+    )
+    matched_address, _, _ = match_address_in_chicago("5496 S Hyde Park Blvd")
+    assert matched_address == FULL_MATCHED_ADDRESSES[0], "Expired cache entry was served"
+    assert GeocodeCache.objects.get(query=query).matched_address == FULL_MATCHED_ADDRESSES[0]
+
+
+@pytest.mark.django_db
+def test_match_address_served_from_local_address_points(monkeypatch):
+    """
+    Test that an address found in the AddressPoint table is matched locally
+    without calling the Census geocoder.
+    """
+    address_point = AddressPoint(address="5514 S BLACKSTONE AVE", zip_code="60637")
+    address_point.setup_location(41.7954, -87.5902)
+    address_point.save()
+
+    def fail_address(*args, **kwargs):
+        raise AssertionError("the Census geocoder should not be called on a local match")
+
+    monkeypatch.setattr(CENSUS_GEOCODER, "address", fail_address)
+    matched_address, longitude, latitude = match_address_in_chicago(
+        "5514 South Blackstone Avenue, Chicago, IL"
+    )
+    assert matched_address == FULL_MATCHED_ADDRESSES[1], "Local address not returned"
+    assert (longitude, latitude) == (-87.5902, 41.7954), "Local coordinates not returned"
+
+
+@pytest.mark.django_db
+def test_local_match_only_allows_street_name_misspellings():
+    """
+    Test that a fuzzy local match keeps the house number, directional, street type and
+    street number, so that a near-miss address never lands on another building.
+    """
+    for address in ["5514 S BLACKSTONE AVE", "1234 W 55TH ST", "1155 E 60TH ST"]:
+        address_point = AddressPoint(address=address, zip_code="60637")
+        address_point.setup_location(41.7954, -87.5902)
+        address_point.save()
+
+    assert match_address_locally("5514 S Blackston Ave").address == "5514 S BLACKSTONE AVE"
+    assert match_address_locally("1234 E 55th St") is None, "E matched W"
+    assert match_address_locally("1155 E 61st St") is None, "61ST matched 60TH"
+    assert match_address_locally("5514 S Blackstone St") is None, "ST matched AVE"
+
+
+@pytest.mark.django_db
+def test_save_property_is_idempotent():
+    """
+    Test that saving the same (canonical) address twice returns the same property id
+    and does not create a duplicate Property.
+    """
+    first_id = save_property_in_django(FULL_MATCHED_ADDRESSES[1], 41.7954, -87.5902)
+    second_id = save_property_in_django("5514 South Blackstone Avenue", 41.7954, -87.5902)
+    assert first_id == second_id, "A second Property was created for the same address"
+    assert Property.objects.filter(canonical_address="5514 S BLACKSTONE AVE").count() == 1
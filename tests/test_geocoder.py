@@ -0,0 +1,158 @@
+import asyncio
+import time
+import httpx
+import pytest
+from apt_app.geocoder import CensusGeocoder, CircuitBreaker, GeocoderUnavailable
+from apt_app.models import GeocodeCache
+from apt_app.views import fetch_all_data
+from apt_app.views.fetch_all_data import match_address_in_chicago, normalize_geocode_query
+
+MATCH = {
+    "matchedAddress": "5514 S BLACKSTONE AVE, CHICAGO, IL, 60637",
+    "coordinates": {"x": -87.5902, "y": 41.7954},
+    "geographies": {"Urban Areas": [{"BASENAME": "Chicago, IL--IN"}]},
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def census_handler(request):
+    """Answer like the Census geocoder: one match for Blackstone, none otherwise."""
+    matches = [MATCH] if "BLACKSTONE" in request.url.params["street"].upper() else []
+    return httpx.Response(200, json={"result": {"addressMatches": matches}})
+
+
+def failing_handler(request):
+    raise httpx.ConnectTimeout("timed out", request=request)
+
+
+def test_circuit_breaker_opens_and_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+
+    # After the reset timeout a single trial request is let through
+    clock.now = 10
+    assert breaker.state == "half-open"
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    # A failed trial opens the circuit again, a successful one closes it
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now = 20
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_geocoder_returns_address_matches():
+    geocoder = CensusGeocoder(transport=httpx.MockTransport(census_handler))
+    assert geocoder.address("5514 S Blackstone Ave") == [MATCH]
+    assert geocoder.address("100 N Non Existent St") == []
+
+
+def test_geocoder_deadline_bounds_a_trickling_response():
+    """httpx timeouts are per read: a response trickling in must still stop at the deadline"""
+
+    def trickling_handler(request):
+        def body():
+            for _ in range(100):
+                time.sleep(0.05)
+                yield b" "
+
+        return httpx.Response(200, content=body())
+
+    geocoder = CensusGeocoder(timeout=0.3, transport=httpx.MockTransport(trickling_handler))
+    start = time.monotonic()
+    with pytest.raises(GeocoderUnavailable):
+        geocoder.address("5514 S Blackstone Ave")
+    assert time.monotonic() - start < 1
+
+
+def test_async_geocoder_returns_address_matches():
+    geocoder = CensusGeocoder(async_transport=httpx.MockTransport(census_handler))
+    assert asyncio.run(geocoder.aaddress("5514 S Blackstone Ave")) == [MATCH]
+
+
+def test_geocoder_fails_fast_when_circuit_is_open():
+    calls = []
+
+    def counting_failing_handler(request):
+        calls.append(request)
+        return failing_handler(request)
+
+    geocoder = CensusGeocoder(
+        transport=httpx.MockTransport(counting_failing_handler),
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+    )
+    for _ in range(2):
+        with pytest.raises(GeocoderUnavailable):
+            geocoder.address("5514 S Blackstone Ave")
+    assert geocoder.breaker.state == "open"
+
+    # The upstream is no longer called while the circuit is open
+    with pytest.raises(GeocoderUnavailable):
+        geocoder.address("5514 S Blackstone Ave")
+    assert len(calls) == 2
+
+
+def test_rejected_addresses_do_not_open_the_circuit():
+    """4xx answers are bad requests, only 5xx, timeouts and transport errors count"""
+    statuses = iter([400, 400, 400, 503, 503])
+
+    def status_handler(request):
+        return httpx.Response(next(statuses), text="error")
+
+    geocoder = CensusGeocoder(
+        transport=httpx.MockTransport(status_handler),
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+    )
+    for _ in range(3):
+        with pytest.raises(GeocoderUnavailable):
+            geocoder.address("Not an address")
+    assert geocoder.breaker.state == "closed"
+
+    for _ in range(2):
+        with pytest.raises(GeocoderUnavailable):
+            geocoder.address("5514 S Blackstone Ave")
+    assert geocoder.breaker.state == "open"
+
+
+@pytest.mark.django_db
+def test_match_address_serves_expired_cache_when_geocoder_is_down(monkeypatch):
+    """
+    Test that an expired geocode cache entry is served when the Census geocoder is
+    unavailable, and that a 503 is returned when there is nothing to fall back on.
+    """
+    geocoder = CensusGeocoder(
+        transport=httpx.MockTransport(failing_handler),
+        breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60),
+    )
+    monkeypatch.setattr(fetch_all_data, "CENSUS_GEOCODER", geocoder)
+    monkeypatch.setattr(fetch_all_data, "match_address_locally", lambda address_input: None)
+
+    GeocodeCache.objects.create(
+        query=normalize_geocode_query("5514 S Blackstone Ave"),
+        matched_address=MATCH["matchedAddress"],
+        longitude=-87.5902,
+        latitude=41.7954,
+        in_chicago=True,
+        cached_at=fetch_all_data.timezone.now() - fetch_all_data.GEOCODE_CACHE_TTL * 2,
+    )
+    matched_address, _, _ = match_address_in_chicago("5514 S Blackstone Ave")
+    assert matched_address == MATCH["matchedAddress"]
+
+    response = match_address_in_chicago("100 N Non Existent St")
+    assert response.status_code == 503
@@ -6,6 +6,8 @@ from django.contrib.gis.geos import Point
 """
 WARNING:
 Designed for test DB, but works on real DB too. Performs writes and deletes—use with caution.
+Test locations are in the middle of Lake Michigan, away from the real amenities (and
+valid lon/lat, as they are projected to UTM 16N on save).
 """
 
 # Fixtures for properties
@@ -13,7 +15,7 @@ Designed for test DB, but works on real DB too. Performs writes and deletes—us
 def test_property_zero(db):
     prop = Property.objects.create(
         address="Zero Test St",
-        location=Point(0.0, 0.0, srid=4326)
+        location=Point(-87.1, 42.7, srid=4326)
     )
     yield prop
     # prop.delete()
@@ -22,7 +24,7 @@ def test_property_zero(db):
 def test_property_result(db):
     prop = Property.objects.create(
         address="Result Test St",
-        location=Point(99.9999, 99.9999, srid=4326)
+        location=Point(-87.0, 42.5, srid=4326)
     )
     # https://docs.pytest.org/en/stable/how-to/fixtures.html#teardown-cleanup-aka-finalization
     yield prop
@@ -32,7 +34,7 @@ def test_property_result(db):
 def test_property_cache(db):
     prop = Property.objects.create(
         address="Cache Test St",
-        location=Point(99.9999, 99.9998, srid=4326)
+        location=Point(-87.0, 42.4999, srid=4326)
     )
     yield prop
     # prop.delete()
@@ -43,7 +45,7 @@ def test_grocery(db):
     grocery = Amenity.objects.create(
         name="Fake Grocery",
         type=AmenityType.GROCERY,
-        location=Point(99.9998, 99.999, srid=4326),
+        location=Point(-87.0001, 42.5009, srid=4326),
         address="124 Test St"
     )
     yield grocery
@@ -56,7 +58,7 @@ def test_fetch_groceries_zero(client, test_property_zero):
     response = client.get(
         "/fetch_groceries/",
         {
-            "geocode": "0.0,0.0",
+            "geocode": "42.7,-87.1",
             "walking_time": 0,
             "property_id": test_property_zero.id,
         },
@@ -72,7 +74,7 @@ def test_fetch_groceries_returns_result(client, test_property_result, test_groce
     response = client.get(
         "/fetch_groceries/",
         {
-            "geocode": "99.9999,99.9999",
+            "geocode": "42.5,-87.0",
             "walking_time": 15,
             "property_id": test_property_result.id,
         },
@@ -91,7 +93,7 @@ def test_fetch_groceries_cache(client, test_property_cache, test_grocery):
     response_1 = client.get(
         "/fetch_groceries/",
         {
-            "geocode": "99.9999,99.9998",
+            "geocode": "42.4999,-87.0",
             "walking_time": 15,
             "property_id": test_property_cache.id,
         },
@@ -108,14 +110,87 @@ def test_fetch_groceries_cache(client, test_property_cache, test_grocery):
     response_2 = client.get(
         "/fetch_groceries/",
         {
-            "geocode": "99.9999,99.9998",
+            "geocode": "42.4999,-87.0",
             "walking_time": 15,
             "property_id": test_property_cache.id,
         },
     )
     data_2 = response_2.json()
     assert response_2.status_code == 200
-    assert data_2 == cached
+    assert data_2 == cached["walking_times"]["15"]
+
+
+# Test 4: Cache hits skip the query, dataset version bumps invalidate the cache
+@pytest.mark.django_db
+def test_fetch_groceries_cache_is_versioned(client, test_property_cache, test_grocery):
+    from apt_app.models import DatasetName, DatasetVersion
+
+    version = DatasetVersion.current(DatasetName.GROCERIES)
+    sentinel = {"address": "cached", "walking_time": 15, "grocery_geojson": {"features": []}}
+    test_property_cache.set_cached_response("groceries", version, 15, sentinel)
+    params = {
+        "geocode": "42.4999,-87.0",
+        "walking_time": 15,
+        "property_id": test_property_cache.id,
+    }
+
+    # Served from the cache, without running the spatial query
+    assert client.get("/fetch_groceries/", params).json() == sentinel
+
+    # Reloading the grocery data makes the cached response stale
+    DatasetVersion.bump(DatasetName.GROCERIES)
+    data = client.get("/fetch_groceries/", params).json()
+    assert len(data["grocery_geojson"]["features"]) > 0
+    test_property_cache.refresh_from_db()
+    assert test_property_cache.groceries["version"] == version + 1
+
+
+# Test 5: Only the nearest stores with a limit
+@pytest.mark.django_db
+def test_fetch_groceries_limit(client, test_property_result, test_grocery):
+    Amenity.objects.create(
+        name="Farther Fake Grocery",
+        type=AmenityType.GROCERY,
+        location=Point(-87.0001, 42.5029, srid=4326),
+        address="126 Test St"
+    )
+    params = {
+        "geocode": "42.5,-87.0",
+        "walking_time": 15,
+        "property_id": test_property_result.id,
+    }
+    features = client.get("/fetch_groceries/", params).json()["grocery_geojson"]["features"]
+    assert [f["properties"]["name"] for f in features] == ["Fake Grocery", "Farther Fake Grocery"]
+
+    # Cut from the cached full response
+    data = client.get("/fetch_groceries/", params | {"limit": 1}).json()
+    features = data["grocery_geojson"]["features"]
+    assert [f["properties"]["name"] for f in features] == ["Fake Grocery"]
+    assert client.get("/fetch_groceries/", params | {"limit": 0}).status_code == 400
+
+
+# Test 6: Concurrent requests for other walking times keep each other's entries
+@pytest.mark.django_db
+def test_cached_responses_are_set_in_place(test_property_cache):
+    from apt_app.models import DatasetName, DatasetVersion, Property as PropertyModel
+
+    version = DatasetVersion.current(DatasetName.GROCERIES)
+    # Both requests read the property before either one writes
+    first = PropertyModel.objects.get(id=test_property_cache.id)
+    second = PropertyModel.objects.get(id=test_property_cache.id)
+    first.set_cached_response("groceries", version, 5, {"walking_time": 5})
+    second.set_cached_response("groceries", version, 15, {"walking_time": 15})
+
+    cached = PropertyModel.objects.get(id=test_property_cache.id).groceries
+    assert cached == {
+        "version": version,
+        "walking_times": {"5": {"walking_time": 5}, "15": {"walking_time": 15}},
+    }
+
+    # A new dataset version replaces the entries of the previous one
+    second.set_cached_response("groceries", version + 1, 10, {"walking_time": 10})
+    cached = PropertyModel.objects.get(id=test_property_cache.id).groceries
+    assert cached == {"version": version + 1, "walking_times": {"10": {"walking_time": 10}}}
 
 
 @pytest.mark.django_db
@@ -126,7 +201,7 @@ def test_endpoint_available(client, test_property_zero):
     response = client.get(
         "/fetch_groceries/",
         {
-            "geocode": "0.0,0.0",
+            "geocode": "42.7,-87.1",
             "walking_time": 15,
             "property_id": test_property_zero.id,
         },
@@ -1,6 +1,18 @@
+import datetime
 import pytest
-from apt_app.views.fetch_inspections import parse_address, _fetch_inspection_summaries
+from apt_app.models import InspectionSummary, Violation
+from apt_app.views.fetch_inspections import (
+    INSPECTION_CATEGORIES,
+    count_violation_stats,
+    parse_address,
+    _fetch_inspection_summaries,
+    refresh_violation_stats,
+    similar_violation_address,
+    violation_stats,
+)
+from scripts.inspections_utils import TRIVIAL_VIOLATION_CODES, select_addresses_to_summarize
 from scripts.inspections_utils import remove_trailing_code_citation, clean_json_string
+from django.contrib.gis.geos import Point
 from django.http import JsonResponse
 import json
 import textwrap
@@ -128,6 +140,109 @@ def test_no_violations_response_format(no_violations_response):
     )
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize("address", available_addresses + trivial_only_addresses)
+def test_violation_stats_match_separate_queries(address):
+    start_date = datetime.date(2020, 1, 1)
+    violations = Violation.objects.filter(
+        address_obj__canonical=address,
+        violation_date__gt=start_date,
+        inspection_category__in=INSPECTION_CATEGORIES,
+    )
+    trivial = violations.filter(violation_code__in=TRIVIAL_VIOLATION_CODES)
+    summary = InspectionSummary.objects.filter(address_obj__canonical=address).first()
+
+    expected = {
+        "total_violations_count": violations.count(),
+        "total_inspections_count": violations.distinct("violation_date").count(),
+        "trivial_violations_count": trivial.count(),
+        "trivial_inspections_count": trivial.distinct("violation_date").count(),
+        "summary": summary.summary if summary else None,
+    }
+    assert count_violation_stats(address, start_date) == expected
+
+    # Precomputed counts, for the default start date
+    refresh_violation_stats()
+    assert violation_stats(address, start_date) == expected
+
+
+@pytest.mark.django_db
+def test_is_trivial_matches_violation_codes():
+    assert (
+        not Violation.objects.filter(is_trivial=True)
+        .exclude(violation_code__in=TRIVIAL_VIOLATION_CODES)
+        .exists()
+    )
+    assert not Violation.objects.filter(
+        is_trivial=False, violation_code__in=TRIVIAL_VIOLATION_CODES
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_select_addresses_to_summarize():
+    addresses = select_addresses_to_summarize()
+    assert set(available_addresses) <= set(addresses)
+    assert set(trivial_only_addresses).isdisjoint(addresses)
+
+
+@pytest.mark.django_db
+def test_address_lookups():
+    address = "5514 S BLACKSTONE AVE"
+    assert Violation.objects.address_startswith("5514 s blackstone").exists()
+    match = Violation.objects.similar_address("5514 S BLACKSTON AVE", 0.6).first()
+    assert match is not None and match.address.upper().startswith(address)
+    assert not Violation.objects.similar_address("99999 S BLACKSTONE AVE", 0.6).exists()
+
+
+@pytest.mark.django_db
+def test_near_miss_address_falls_back_to_similar_address():
+    response = json.loads(_fetch_inspection_summaries("5514 S Blackston Ave").content)
+    assert response["matched_address"] == "5514 S BLACKSTONE AVE"
+    assert response["data_status"] == "available"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "address, other_building",
+    [
+        ("1234 E 55TH ST", "1234 W 55TH ST"),
+        ("1155 E 61ST ST", "1155 E 60TH ST"),
+    ],
+)
+def test_similar_address_does_not_match_other_buildings(address, other_building):
+    number, direction, name, street_type = other_building.split()
+    Violation.objects.create(
+        violation_id="T" + number,
+        violation_last_modified_date=datetime.date(2024, 1, 2),
+        violation_date=datetime.date(2024, 1, 2),
+        violation_code="CN190019",
+        violation_status="OPEN",
+        violation_description="ARRANGE PREMISE INSPECTION",
+        violation_location="",
+        violation_inspector_comments="",
+        violation_ordinance="",
+        inspector_id="",
+        inspection_number=0,
+        inspection_status="FAILED",
+        inspection_waived="N",
+        inspection_category="COMPLAINT",
+        department_bureau="CONSERVATION",
+        address=other_building,
+        street_number=int(number),
+        street_direction=direction,
+        street_name=name,
+        street_type=street_type,
+        property_group=0,
+        ssa="",
+        latitude=41.7954,
+        longitude=-87.5902,
+        location=Point(-87.5902, 41.7954, srid=4326),
+    )
+    assert similar_violation_address(address) is None
+    response = json.loads(_fetch_inspection_summaries(address).content)
+    assert "matched_address" not in response
+
+
 @pytest.mark.django_db
 def test_endpoint_available(client):
     """
@@ -137,6 +252,17 @@ def test_endpoint_available(client):
     assert response.status_code == 200, f"Response status code: {response.status_code} is not 200"
 
 
+@pytest.mark.django_db
+def test_endpoint_no_violations(client):
+    """
+    Test that an address without violations (which tries the similar address fallback)
+    is answered, not turned into an error
+    """
+    response = client.get("/fetch_inspections/", {"address": no_violations_addresses[0]})
+    assert response.status_code == 200, f"Response status code: {response.status_code} is not 200"
+    assert json.loads(response.content)["data_status"] == "no_violations"
+
+
 def test_missing_address_param(client):
     response = client.get("/fetch_inspections/")
     assert response.status_code == 400, f"Response status code: {response.status_code} is not 400"
@@ -0,0 +1,46 @@
+import json
+import pytest
+
+SECTIONS = {"bus_stops", "groceries", "inspections", "bus_routes"}
+
+
+@pytest.mark.django_db
+def test_fetch_property_bundle_returns_all_sections(client):
+    """
+    Test that the bundle returns every section with the status of its own endpoint
+    """
+    response = client.get("/fetch_property_bundle/", {"property_id": "35", "walking_time": "5"})
+    assert response.status_code == 200, f"Response status code: {response.status_code} is not 200"
+
+    content = json.loads(response.content)
+    assert content["property_id"] == 35
+    assert set(content["sections"]) == SECTIONS, "Missing sections in the bundle"
+    for name, section in content["sections"].items():
+        assert {"status", "data"} <= set(section), f"Section {name} is not well formed"
+    assert content["sections"]["bus_stops"]["status"] == 200
+    assert "bus_stops_geojson" in content["sections"]["bus_stops"]["data"]
+    # Route ids and colors only, the map draws the routes from the vector tiles
+    for route in content["sections"]["bus_routes"]["data"].get("routes", []):
+        assert set(route) == {"route_id", "name", "type", "color"}
+
+
+@pytest.mark.django_db
+def test_fetch_property_bundle_streams_sections(client):
+    """
+    Test that the streamed bundle sends one NDJSON line per section, property first
+    """
+    response = client.get(
+        "/fetch_property_bundle/", {"property_id": "35", "walking_time": "5", "stream": "1"}
+    )
+    assert response.status_code == 200, f"Response status code: {response.status_code} is not 200"
+    assert response["Content-Type"] == "application/x-ndjson"
+
+    lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+    assert lines[0]["section"] == "property"
+    assert {line["section"] for line in lines[1:]} == SECTIONS
+
+
+@pytest.mark.django_db
+def test_fetch_property_bundle_unknown_property(client):
+    response = client.get("/fetch_property_bundle/", {"property_id": "-1"})
+    assert response.status_code == 404, f"Response status code: {response.status_code} is not 404"
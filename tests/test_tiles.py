@@ -0,0 +1,129 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from apt_app.models import DatasetName, DatasetVersion
+from apt_app.tiles import (
+    TILE_CONTENT_TYPE,
+    TILE_MAX_ZOOM,
+    TILE_STORE_MAX_ZOOM,
+    invalidate_tiles,
+    is_stored_tile,
+    is_valid_tile,
+    layer_version,
+    render_tile,
+    tile_path,
+    tiles_covering,
+)
+from config import load_constants
+
+# Zoom 14 tile over Hyde Park (-87.5995, 41.7925)
+HYDE_PARK_TILE = (14, 4205, 6094)
+
+
+@pytest.fixture(autouse=True)
+def isolated_tile_store(settings, tmp_path):
+    """Run each test against its own empty tile store and version cache"""
+    settings.TILE_STORE_DIR = tmp_path / "tiles"
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test-tile-store",
+        }
+    }
+    yield
+    cache.clear()
+
+
+def test_is_valid_tile():
+    assert is_valid_tile(0, 0, 0)
+    assert is_valid_tile(*HYDE_PARK_TILE)
+    assert not is_valid_tile(0, 1, 0)
+    assert not is_valid_tile(14, 4205, 2**14)
+    assert not is_valid_tile(-1, 0, 0)
+    assert not is_valid_tile(TILE_MAX_ZOOM + 1, 0, 0)
+
+
+def test_tiles_covering_hyde_park():
+    z, x, y = HYDE_PARK_TILE
+    tiles = list(tiles_covering(load_constants()["HP_BOUNDS"], z))
+    assert (x, y) in tiles
+    assert len(tiles) == len(set(tiles)) < 20
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("layer", ["routes", "stops"])
+def test_tile_of_transit_layer(client, layer):
+    z, x, y = HYDE_PARK_TILE
+    response = client.get(f"/tiles/{layer}/{z}/{x}/{y}.pbf")
+    assert response.status_code == 200
+    assert response["Content-Type"] == TILE_CONTENT_TYPE
+    assert len(response.content) > 0, f"Expected {layer} in the Hyde Park tile"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("z", [10, 12, 14, 16])
+def test_route_tiles_at_each_geometry_level(z):
+    """Route tiles are built from the simplified geometry column of their zoom"""
+    # Tile of 55th St & Ellis Ave, on route 55
+    point = {"north": 41.7951, "south": 41.7951, "east": -87.6010, "west": -87.6010}
+    [(x, y)] = tiles_covering(point, z)
+    assert len(render_tile("routes", z, x, y)) > 0
+
+
+@pytest.mark.django_db
+def test_tile_below_min_zoom_is_empty(client):
+    response = client.get("/tiles/stops/10/262/380.pbf")
+    assert response.status_code == 200
+    assert response.content == b""
+
+
+@pytest.mark.django_db
+def test_tile_errors(client):
+    assert client.get("/tiles/parcels/14/4205/6094.pbf").status_code == 404
+    assert client.get("/tiles/stops/14/4205/16384.pbf").status_code == 400
+
+
+@pytest.mark.django_db
+def test_tiles_are_stored_until_the_data_is_reloaded(client):
+    z, x, y = HYDE_PARK_TILE
+    url = f"/tiles/stops/{z}/{x}/{y}.pbf"
+    first = client.get(url)
+    second = client.get(url)
+    assert first["X-Cache"] == "MISS"
+    assert second["X-Cache"] == "HIT"
+    assert first.content == second.content
+
+    old_path = tile_path("stops", layer_version("stops"), z, x, y)
+    assert old_path.read_bytes() == first.content
+
+    DatasetVersion.bump(DatasetName.TRANSIT)
+    assert invalidate_tiles([DatasetName.TRANSIT]) == 1
+    assert not old_path.exists()
+    assert client.get(url)["X-Cache"] == "MISS"
+
+
+def test_is_stored_tile():
+    z, x, y = HYDE_PARK_TILE
+    assert is_stored_tile(z, x, y)
+    assert not is_stored_tile(z, 0, 0), "Tiles outside Hyde Park are not stored"
+    assert not is_stored_tile(TILE_STORE_MAX_ZOOM + 1, x << 8, y << 8)
+
+
+@pytest.mark.django_db
+def test_only_non_empty_hyde_park_tiles_are_stored(client, settings):
+    # Outside Hyde Park: rendered on every request, never written
+    assert client.get("/tiles/routes/14/0/0.pbf")["X-Cache"] == "MISS"
+    assert client.get("/tiles/routes/14/0/0.pbf")["X-Cache"] == "MISS"
+    # Empty tile over Hyde Park: not written either
+    z, x, y = HYDE_PARK_TILE
+    assert client.get(f"/tiles/stops/10/{x >> 4}/{y >> 4}.pbf").content == b""
+    assert not any(path.is_file() for path in settings.TILE_STORE_DIR.rglob("*"))
+
+
+@pytest.mark.django_db
+def test_seed_tiles():
+    call_command("seed_tiles", layers="routes", min_zoom=13, max_zoom=14)
+    version = layer_version("routes")
+    z, x, y = HYDE_PARK_TILE
+    assert tile_path("routes", version, z, x, y).exists()
+    assert not tile_path("stops", layer_version("stops"), z, x, y).exists()